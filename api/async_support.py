@@ -0,0 +1,77 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+io_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_IO_WORKERS, thread_name_prefix='async-io')
+cpu_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_CPU_WORKERS, thread_name_prefix='async-cpu')
+
+
+def _call_closing_connections(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Executor threads outlive requests, so they drop expired connections like a request thread would.
+        close_old_connections()
+
+
+async def _run_in(executor, func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _call_closing_connections, func, args, kwargs)
+
+
+async def run_io(func, *args, **kwargs):
+    return await _run_in(io_executor, func, *args, **kwargs)
+
+
+async def run_cpu(func, *args, **kwargs):
+    return await _run_in(cpu_executor, func, *args, **kwargs)
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status_code)
+
+
+def authenticate(request):
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        user_auth = authentication_class().authenticate(request)
+        if user_auth is not None:
+            return user_auth[0]
+    return None
+
+
+def not_authenticated_response(request, detail):
+    response = json_response(detail if isinstance(detail, dict) else {'detail': detail}, status.HTTP_401_UNAUTHORIZED)
+    authenticators = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    if authenticators:
+        response['WWW-Authenticate'] = authenticators[0]().authenticate_header(request)
+    return response
+
+
+def async_api_view(http_method_names):
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in http_method_names:
+                return json_response({'detail': f'Method "{request.method}" not allowed.'},
+                                     status.HTTP_405_METHOD_NOT_ALLOWED)
+            try:
+                user = await run_io(authenticate, request)
+            except exceptions.AuthenticationFailed as ex:
+                return not_authenticated_response(request, ex.detail)
+            if user is None or not user.is_authenticated:
+                return not_authenticated_response(request, exceptions.NotAuthenticated.default_detail)
+            request.user = user
+            return await view(request, *args, **kwargs)
+
+        # Token authentication makes CSRF checks unnecessary, as for DRF views.
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
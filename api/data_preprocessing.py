@@ -1,6 +1,8 @@
-import pandas as pd
+import re
 
-from api.models import Category, Organization, EvaluationMetric, RewardType
+import numpy as np
+import pandas as pd
+from scipy import sparse
 
 DELETED_COLUMNS = ['Id', 'Slug', 'ForumId', 'CompetitionTypeId', 'TeamModelDeadlineDate', 'ModelSubmissionDeadlineDate',
                    'FinalLeaderboardHasBeenVerified', 'HasKernels', 'OnlyAllowKernelSubmissions', 'HasLeaderboard',
@@ -18,9 +20,14 @@ DATE_COLUMNS = ['deadline', 'newentrantdeadline', 'mergerdeadline', 'enableddate
 
 CAT_FEATURES = ['category', 'organizationname', 'evaluationmetric', 'rewardtype']
 TEXT_FEATURES = ['title', 'description']
+NUMERIC_FEATURES = ['maxdailysubmissions', 'maxteamsize', 'rewardquantity', 'duration', 'day_to_new', 'day_to_team']
 
 DATETIME_FORMAT = '%m/%d/%Y %H:%M:%S'
 
+REWARD_CURRENCIES = {'$': 'USD', '€': 'EUR'}
+
+TAG_DTYPE = pd.SparseDtype(np.uint8, 0)
+
 
 def fill_string_na(df, features):
     for feature in features:
@@ -47,8 +54,8 @@ def preprocess_data(df):
 
     create_new_features(df)
 
-    df['day_to_new'].fillna(df.mode()['day_to_new'][0], inplace=True)
-    df['day_to_team'].fillna(df.mode()['day_to_team'][0], inplace=True)
+    df['day_to_new'].fillna(df['day_to_new'].mode()[0], inplace=True)
+    df['day_to_team'].fillna(df['day_to_team'].mode()[0], inplace=True)
 
     df['rewardquantity'].fillna(0, inplace=True)
 
@@ -62,29 +69,55 @@ def preprocess_data(df):
     return x, y
 
 
-def replace_non_existent_categories(df, row, names):
-    if str(row) not in names:
-        df.replace(row, '', inplace=True)
+def parse_rewards(rewards):
+    prefixes = '|'.join(re.escape(prefix) for prefix in REWARD_CURRENCIES)
+    parts = rewards.str.extract(rf'^({prefixes})(.*)$')
+
+    is_money = parts[0].notna()
+    reward_type = parts[0].map(REWARD_CURRENCIES).where(is_money, rewards)
+    amounts = pd.to_numeric(parts[1].str.replace(',', '', regex=False), errors='coerce')
+    reward_quantity = amounts.where(is_money, 0).fillna(0).astype('int64')
+    return reward_type, reward_quantity
+
+
+def encode_tags(tags, vocabulary):
+    lengths = tags.map(len).to_numpy()
+    rows = np.repeat(np.arange(len(tags)), lengths)
+    codes = pd.Categorical([str(t) for competition_tags in tags for t in competition_tags], categories=vocabulary).codes
+    cells = np.unique(rows[codes >= 0] * len(vocabulary) + codes[codes >= 0])
+
+    matrix = sparse.csc_matrix((np.ones(len(cells), dtype=np.uint8), divmod(cells, len(vocabulary))),
+                               shape=(len(tags), len(vocabulary)))
+    return pd.DataFrame.sparse.from_spmatrix(matrix, index=tags.index, columns=vocabulary)
+
 
+def tag_features(feature_names):
+    non_tag_features = set(CAT_FEATURES + TEXT_FEATURES + NUMERIC_FEATURES)
+    return [name for name in feature_names if name not in non_tag_features]
 
-def preprocess_active_competitions(df):
+
+def tag_positions(df, tag_names):
+    return df[tag_names].sparse.to_coo().tocsr().nonzero()
+
+
+def build_category_vocabularies(x):
+    return {feature: sorted(set(x[feature].astype(str))) for feature in CAT_FEATURES}
+
+
+def replace_non_existent_categories(df, vocabularies):
+    for feature in CAT_FEATURES:
+        known = df[feature].astype(str).isin(vocabularies[feature])
+        df[feature] = df[feature].where(known, '')
+
+
+def preprocess_active_competitions(df, vocabularies):
 
     for column in DATE_COLUMNS:
         df[column].fillna(df['deadline'], inplace=True)
 
     create_new_features(df)
 
-    df['day_to_new'].fillna(df.mode()['day_to_new'][0], inplace=True)
-    df['day_to_team'].fillna(df.mode()['day_to_team'][0], inplace=True)
-
-    categories_names = map(lambda x: x.name, Category.objects.all())
-    organization_names = map(lambda x: x.name, Organization.objects.all())
-    evaluation_metric_names = map(lambda x: x.name, EvaluationMetric.objects.all())
-    reward_type_names = map(lambda x: x.name, RewardType.objects.all())
-
-    for index, row in df.iterrows():
+    df['day_to_new'].fillna(df['day_to_new'].mode()[0], inplace=True)
+    df['day_to_team'].fillna(df['day_to_team'].mode()[0], inplace=True)
 
-        replace_non_existent_categories(df, row['category'], categories_names)
-        replace_non_existent_categories(df, row['organizationname'], organization_names)
-        replace_non_existent_categories(df, row['evaluationmetric'], evaluation_metric_names)
-        replace_non_existent_categories(df, row['rewardtype'], reward_type_names)
+    replace_non_existent_categories(df, vocabularies)
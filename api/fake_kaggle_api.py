@@ -0,0 +1,93 @@
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+# The same formats the kaggle client parses; the kaggle package itself authenticates on import.
+KAGGLE_DATETIME_FORMATS = ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ', '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S.%fZ']
+
+
+def parse_kaggle_value(value):
+    if not isinstance(value, str):
+        return value
+    for datetime_format in KAGGLE_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value[:26], datetime_format).replace(microsecond=0)
+        except ValueError:
+            pass
+    return value
+
+
+class FakeTag:
+    def __init__(self, ref, name):
+        self.ref = ref
+        self.name = name
+
+    def __repr__(self):
+        return self.ref
+
+
+class FakeCompetition:
+    def __init__(self, fields):
+        self.__dict__.update({key: parse_kaggle_value(value) for key, value in fields.items()})
+        self.tags = [FakeTag(t, t) if isinstance(t, str) else FakeTag(t['ref'], t['name']) for t in self.tags]
+
+    def __repr__(self):
+        return self.ref
+
+
+def make_competition(**fields):
+    init_dict = {
+        'id': 0,
+        'ref': '',
+        'title': '',
+        'description': '',
+        'organizationName': None,
+        'category': 'Featured',
+        'reward': 'Knowledge',
+        'tags': [],
+        'deadline': '2030-01-01T00:00:00Z',
+        'enabledDate': '2030-01-01T00:00:00Z',
+        'mergerDeadline': None,
+        'newEntrantDeadline': None,
+        'maxDailySubmissions': 5,
+        'maxTeamSize': 5,
+        'evaluationMetric': '',
+    }
+    init_dict.update(fields)
+    return FakeCompetition(init_dict)
+
+
+class FakeKaggleApi:
+    def __init__(self, competitions=None, latency=0.0, datasets_dir=None, page_size=20, pages=None):
+        self.competitions = list(competitions or [])
+        self.latency = latency
+        self.datasets_dir = datasets_dir
+        self.page_size = page_size
+        self.pages = pages
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def _count_call(self):
+        with self._calls_lock:
+            self.calls += 1
+
+    def authenticate(self):
+        pass
+
+    def competitions_list(self, group=None, category=None, sort_by=None, page=1, search=None):
+        self._count_call()
+        if self.latency:
+            time.sleep(self.latency)
+        if self.pages is not None and page > self.pages:
+            return []
+        return self.competitions[(page - 1) * self.page_size:page * self.page_size]
+
+    def dataset_download_file(self, dataset, file_name, path=None, force=False, quiet=True):
+        self._count_call()
+        source = os.path.join(self.datasets_dir, f"{file_name}.zip")
+        if not os.path.exists(source):
+            source = os.path.join(self.datasets_dir, file_name)
+        shutil.copy(source, os.path.join(path or '.', os.path.basename(source)))
+        return True
@@ -0,0 +1,127 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from scipy import sparse
+
+from .data_preprocessing import TAG_DTYPE
+from .files import atomic_open
+
+FEATURE_STORE_PATH = "api/data/competitions.arrow"
+TAG_COLUMNS_METADATA_KEY = b'tag_columns'
+
+BASE_SCHEMA = pa.schema([
+    ('Id', pa.int64()),
+    ('Slug', pa.string()),
+    ('Title', pa.string()),
+    ('Subtitle', pa.string()),
+    ('HostSegmentTitle', pa.string()),
+    ('ForumId', pa.int64()),
+    ('OrganizationName', pa.string()),
+    ('EnabledDate', pa.string()),
+    ('DeadlineDate', pa.string()),
+    ('ProhibitNewEntrantsDeadlineDate', pa.string()),
+    ('TeamMergerDeadlineDate', pa.string()),
+    ('TeamModelDeadlineDate', pa.string()),
+    ('ModelSubmissionDeadlineDate', pa.string()),
+    ('FinalLeaderboardHasBeenVerified', pa.bool_()),
+    ('HasKernels', pa.bool_()),
+    ('OnlyAllowKernelSubmissions', pa.bool_()),
+    ('HasLeaderboard', pa.bool_()),
+    ('LeaderboardPercentage', pa.int64()),
+    ('LeaderboardDisplayFormat', pa.float64()),
+    ('EvaluationAlgorithmAbbreviation', pa.string()),
+    ('EvaluationAlgorithmName', pa.string()),
+    ('EvaluationAlgorithmDescription', pa.string()),
+    ('EvaluationAlgorithmIsMax', pa.bool_()),
+    ('ValidationSetName', pa.string()),
+    ('ValidationSetValue', pa.string()),
+    ('MaxDailySubmissions', pa.int64()),
+    ('NumScoredSubmissions', pa.int64()),
+    ('MaxTeamSize', pa.int64()),
+    ('BanTeamMergers', pa.bool_()),
+    ('EnableTeamModels', pa.bool_()),
+    ('EnableSubmissionModelHashes', pa.bool_()),
+    ('EnableSubmissionModelAttachments', pa.bool_()),
+    ('RewardType', pa.string()),
+    ('RewardQuantity', pa.float64()),
+    ('NumPrizes', pa.int64()),
+    ('UserRankMultiplier', pa.float64()),
+    ('CanQualifyTiers', pa.bool_()),
+    ('TotalTeams', pa.int64()),
+    ('TotalCompetitors', pa.int64()),
+    ('TotalSubmissions', pa.int64()),
+    ('HostName', pa.string()),
+    ('CompetitionTypeId', pa.int64()),
+])
+
+
+def to_arrow_column(values, data_type):
+    if data_type is None:
+        return pa.array(values, from_pandas=True)
+    if pa.types.is_string(data_type):
+        values = values.mask(values.astype(str) == 'nan')
+    return pa.array(values, type=data_type, from_pandas=True)
+
+
+def build_feature_table(df, tag_columns):
+    tag_columns = list(tag_columns)
+    tag_columns_set = set(tag_columns)
+    base_columns = [column for column in df.columns if column not in tag_columns_set]
+
+    arrays = []
+    for column in base_columns:
+        index = BASE_SCHEMA.get_field_index(column)
+        arrays.append(to_arrow_column(df[column], BASE_SCHEMA.field(index).type if index != -1 else None))
+    for column in tag_columns:
+        arrays.append(pa.array(df[column].to_numpy() != 0, type=pa.bool_()))
+
+    metadata = {TAG_COLUMNS_METADATA_KEY: json.dumps(tag_columns).encode('utf-8')}
+    return pa.Table.from_arrays(arrays, names=base_columns + tag_columns, metadata=metadata)
+
+
+def write_features(df, tag_columns, path=FEATURE_STORE_PATH):
+    table = build_feature_table(df, tag_columns)
+    with atomic_open(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_schema(path=FEATURE_STORE_PATH):
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def tag_columns(path=FEATURE_STORE_PATH):
+    return json.loads(read_schema(path).metadata[TAG_COLUMNS_METADATA_KEY])
+
+
+def read_features(columns=None, path=FEATURE_STORE_PATH):
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        tag_names = set(json.loads(table.schema.metadata[TAG_COLUMNS_METADATA_KEY]))
+        if columns is not None:
+            table = table.select(list(columns))
+        base_columns = [name for name in table.column_names if name not in tag_names]
+        base = table.select(base_columns)
+        df = base.to_pandas()
+
+        for name, column in zip(base.column_names, base.columns):
+            if column.null_count and df[name].dtype == object:
+                values = df[name].to_numpy()
+                values[column.is_null().to_numpy()] = np.nan
+
+        # Each stored bool column becomes one CSC column, so no dense rows x tags matrix is ever allocated.
+        tag_columns = [name for name in table.column_names if name in tag_names]
+        rows = [np.flatnonzero(table.column(name).to_numpy()) for name in tag_columns]
+        indptr = np.concatenate([[0], np.cumsum([len(column_rows) for column_rows in rows])])
+        indices = np.concatenate([np.empty(0, dtype=np.int64)] + rows)
+        matrix = sparse.csc_matrix((np.ones(len(indices), dtype=TAG_DTYPE.subtype), indices, indptr),
+                                   shape=(table.num_rows, len(tag_columns)))
+        tags = pd.DataFrame.sparse.from_spmatrix(matrix, index=df.index, columns=tag_columns)
+
+    df = pd.concat([df, tags], axis=1)
+    if list(df.columns) != table.column_names:
+        df = df[table.column_names]
+    return df
@@ -0,0 +1,15 @@
+import contextlib
+import os
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode='w', **kwargs):
+    # Readers in other processes see either the previous file or the complete new one, never a partial write.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,4 +1,29 @@
-from kaggle.api.kaggle_api_extended import KaggleApi
+from django.conf import settings
 
-api = KaggleApi()
-api.authenticate()
+from .kaggle_cache import CachedKaggleApi, get_cache_backend
+from .kaggle_client import ResilientKaggleClient
+from .kaggle_pagination import CompetitionsFetcher
+
+
+def create_kaggle_api():
+    # Importing the kaggle package authenticates, so it is deferred until the first call.
+    from kaggle.api.kaggle_api_extended import KaggleApi
+
+    return KaggleApi()
+
+
+api = ResilientKaggleClient(create_kaggle_api,
+                            connect_timeout=settings.KAGGLE_CLIENT['CONNECT_TIMEOUT'],
+                            read_timeout=settings.KAGGLE_CLIENT['READ_TIMEOUT'],
+                            pool_size=settings.KAGGLE_CLIENT['POOL_SIZE'],
+                            max_retries=settings.KAGGLE_CLIENT['MAX_RETRIES'],
+                            backoff_base=settings.KAGGLE_CLIENT['BACKOFF_BASE'],
+                            backoff_max=settings.KAGGLE_CLIENT['BACKOFF_MAX'],
+                            failure_threshold=settings.KAGGLE_CLIENT['FAILURE_THRESHOLD'],
+                            reset_timeout=settings.KAGGLE_CLIENT['RESET_TIMEOUT'])
+
+competitions_fetcher = CompetitionsFetcher(max_workers=settings.KAGGLE_PAGE_WORKERS,
+                                           page_timeout=settings.KAGGLE_PAGE_TIMEOUT,
+                                           max_pages=settings.KAGGLE_MAX_PAGES)
+cached_api = CachedKaggleApi(api, get_cache_backend(settings.KAGGLE_CACHE_BACKEND), ttl=settings.KAGGLE_CACHE_TTL,
+                             fetcher=competitions_fetcher)
@@ -0,0 +1,155 @@
+import collections
+import threading
+import time
+
+from django.core.cache import caches
+
+from .kaggle_pagination import CompetitionsFetcher
+
+
+class CacheEntry:
+    def __init__(self, value, fetched_at: float):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class LocMemBackend:
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        self.set_many({key: entry})
+
+    def get_many(self, keys):
+        with self._lock:
+            entries = {}
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entries[key] = entry
+            return entries
+
+    def set_many(self, entries):
+        with self._lock:
+            for key, entry in entries.items():
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DjangoCacheBackend:
+    def __init__(self, alias='default', prefix='kaggle'):
+        self.cache = caches[alias]
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.cache.get(f"{self.prefix}:{key}")
+
+    def set(self, key, entry):
+        self.cache.set(f"{self.prefix}:{key}", entry, timeout=None)
+
+    def get_many(self, keys):
+        entries = self.cache.get_many([f"{self.prefix}:{key}" for key in keys])
+        return {key: entries[f"{self.prefix}:{key}"] for key in keys if f"{self.prefix}:{key}" in entries}
+
+    def set_many(self, entries):
+        self.cache.set_many({f"{self.prefix}:{key}": entry for key, entry in entries.items()}, timeout=None)
+
+
+def get_cache_backend(name, **options):
+    if name == 'locmem':
+        return LocMemBackend(**options)
+    if name == 'django':
+        return DjangoCacheBackend(**options)
+    raise ValueError(f"Unknown Kaggle cache backend: {name}")
+
+
+class CachedKaggleApi:
+    def __init__(self, api, backend, ttl, fetcher=None):
+        self.api = api
+        self.backend = backend
+        self.ttl = ttl
+        self.fetcher = fetcher or CompetitionsFetcher()
+        self._lock = threading.Lock()
+        self._key_locks = collections.defaultdict(threading.Lock)
+        self._refreshing = set()
+        self._stats = collections.Counter()
+
+    def __getattr__(self, name):
+        return getattr(self.api, name)
+
+    def competitions_list(self, **kwargs):
+        return self.competitions_list_entry(**kwargs).value
+
+    def competitions_list_entry(self, **kwargs):
+        key = 'competitions_list:' + ','.join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+        return self._cached(key, lambda: self.fetcher.fetch_all(self.api, **kwargs))
+
+    def _cached(self, key, fetch):
+        entry = self.backend.get(key)
+        if entry is None:
+            return self._load(key, fetch)
+
+        if time.time() - entry.fetched_at < self.ttl:
+            self._count('hits')
+        else:
+            self._count('stale_hits')
+            self._refresh_in_background(key, fetch)
+        return entry
+
+    def _load(self, key, fetch):
+        # Concurrent misses on the same key wait for a single upstream call.
+        with self._lock:
+            key_lock = self._key_locks[key]
+        with key_lock:
+            entry = self.backend.get(key)
+            if entry is not None:
+                self._count('hits')
+                return entry
+            self._count('misses')
+            return self._fetch(key, fetch)
+
+    def _fetch(self, key, fetch):
+        entry = CacheEntry(fetch(), time.time())
+        self.backend.set(key, entry)
+        self._count('fetches')
+        return entry
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, fetch), daemon=True).start()
+
+    def _refresh(self, key, fetch):
+        try:
+            self._fetch(key, fetch)
+        except Exception as ex:
+            self._count('refresh_errors')
+            print(f"Kaggle cache refresh of {key} failed: {ex}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        for name in ('hits', 'stale_hits', 'misses', 'fetches', 'refresh_errors'):
+            stats.setdefault(name, 0)
+        return stats
@@ -0,0 +1,185 @@
+import collections
+import random
+import threading
+import time
+
+import urllib3
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def is_retryable(ex):
+    # kaggle.rest.ApiException carries the HTTP status of the failed response.
+    status = getattr(ex, 'status', None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUSES
+    return isinstance(ex, (urllib3.exceptions.HTTPError, ConnectionError, TimeoutError))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                # Only one trial call probes the upstream, the rest keep failing fast.
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+                return True
+            return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"Kaggle circuit breaker opened after {self.failures} failures.")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        with self._lock:
+            self._trial_running = False
+
+
+class ResilientKaggleClient:
+    def __init__(self, api_factory, connect_timeout=5.0, read_timeout=30.0, pool_size=10, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0, failure_threshold=5, reset_timeout=60.0):
+        self.api_factory = api_factory
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._api = None
+        self._api_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._last_good = {}
+        self._stats = collections.defaultdict(collections.Counter)
+        self._latency = collections.defaultdict(float)
+
+    def _get_api(self):
+        api = self._api
+        if api is not None:
+            return api
+        with self._api_lock:
+            if self._api is None:
+                api = self.api_factory()
+                api.authenticate()
+                if hasattr(api, 'api_client'):
+                    self._configure_transport(api.api_client)
+                self._api = api
+            return self._api
+
+    def _configure_transport(self, api_client):
+        from kaggle.rest import RESTClientObject
+
+        # One pooled urllib3 manager per process, and a default timeout for every request it sends.
+        rest_client = RESTClientObject(api_client.configuration, maxsize=self.pool_size)
+        request = rest_client.request
+        timeout = (self.connect_timeout, self.read_timeout)
+
+        def request_with_timeout(*args, _request_timeout=None, **kwargs):
+            return request(*args, _request_timeout=_request_timeout or timeout, **kwargs)
+
+        rest_client.request = request_with_timeout
+        api_client.rest_client = rest_client
+
+    def competitions_list(self, **kwargs):
+        return self._call('competitions_list', kwargs, fallback=True)
+
+    def dataset_download_file(self, dataset, file_name, path=None, quiet=True):
+        # Retries must overwrite a partially written file instead of trusting its modification time.
+        return self._call('dataset_download_file',
+                          dict(dataset=dataset, file_name=file_name, path=path, force=True, quiet=quiet))
+
+    def _call(self, method, kwargs, fallback=False):
+        key = (method, tuple(sorted(kwargs.items())))
+        try:
+            result = self._call_with_retries(method, kwargs)
+        except Exception as ex:
+            if not fallback or key not in self._last_good:
+                raise
+            self._count(method, 'fallbacks')
+            print(f"Kaggle {method} failed, serving the last good result: {ex!r}")
+            return self._last_good[key]
+
+        if fallback:
+            self._last_good[key] = result
+        return result
+
+    def _call_with_retries(self, method, kwargs):
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count(method, 'short_circuits')
+                raise CircuitOpenError(f"Kaggle circuit breaker is open, {method} was not called.")
+
+            self._count(method, 'calls')
+            start = time.perf_counter()
+            try:
+                result = getattr(self._get_api(), method)(**kwargs)
+            except Exception as ex:
+                self._record_latency(method, time.perf_counter() - start)
+                if not is_retryable(ex):
+                    self.breaker.release()
+                    self._count(method, 'errors')
+                    raise
+                self.breaker.record_failure()
+                self._count(method, 'failures')
+                if attempt == self.max_retries:
+                    raise
+                self._count(method, 'retries')
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+                continue
+
+            self._record_latency(method, time.perf_counter() - start)
+            self.breaker.record_success()
+            return result
+
+    def _count(self, method, name):
+        with self._lock:
+            self._stats[method][name] += 1
+
+    def _record_latency(self, method, duration):
+        with self._lock:
+            self._latency[method] += duration
+            self._stats[method]['max_latency_ms'] = max(self._stats[method]['max_latency_ms'],
+                                                        round(duration * 1000))
+
+    def stats(self):
+        with self._lock:
+            methods = {}
+            for method, counters in self._stats.items():
+                stats = dict(counters)
+                for name in ('calls', 'failures', 'errors', 'retries', 'short_circuits', 'fallbacks'):
+                    stats.setdefault(name, 0)
+                stats['avg_latency_ms'] = round(self._latency[method] * 1000 / stats['calls']) if stats['calls'] else 0
+                methods[method] = stats
+        return {'circuit': self.breaker.state, 'consecutive_failures': self.breaker.failures, 'methods': methods}
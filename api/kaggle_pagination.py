@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CompetitionsFetcher:
+    def __init__(self, max_workers=4, page_timeout=10.0, max_pages=50):
+        self.max_workers = max_workers
+        self.page_timeout = page_timeout
+        self.max_pages = max_pages
+
+    def fetch_all(self, api, **kwargs):
+        competitions = {}
+        futures = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='kaggle-page')
+        try:
+            next_page = 1
+            for page in range(1, self.max_pages + 1):
+                # Pages ahead of the one being consumed are requested speculatively, at most max_workers at a time.
+                while next_page <= self.max_pages and next_page < page + self.max_workers:
+                    futures[next_page] = executor.submit(api.competitions_list, page=next_page, **kwargs)
+                    next_page += 1
+
+                page_competitions = futures.pop(page).result(timeout=self.page_timeout)
+                if not page_competitions:
+                    break
+                for competition in page_competitions:
+                    competitions.setdefault(competition.id, competition)
+            else:
+                print(f"Kaggle competitions list was truncated at {self.max_pages} pages.")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return list(competitions.values())
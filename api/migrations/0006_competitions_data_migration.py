@@ -1,17 +1,18 @@
 # Generated by Django 4.1.5 on 2023-03-15 19:49
-import pandas as pd
 import logging
 import math
 
 from django.db import migrations
 from datetime import datetime
 
+from api.feature_store import read_features, tag_columns
 from api.models import RewardType, Category, EvaluationMetric, Competition, Organization, Tag
+from api.reference_cache import reference_cache
 from api.utils import extract_competition_from_row
 
 
 def add_comp_categories(apps, schema_editor):
-    df_competitions = pd.read_csv("api/data/out.csv", low_memory=False)
+    df_competitions = read_features()
     comp_categories = set(df_competitions['HostSegmentTitle'])
     reward_types = set(df_competitions['RewardType'])
     evaluation_metrics = set(df_competitions['EvaluationAlgorithmName'])
@@ -28,21 +29,22 @@ def add_comp_categories(apps, schema_editor):
         new_eval_metric = EvaluationMetric(name=em)
         new_eval_metric.save()
 
-    tag_names = list(df_competitions.columns.values)
-    tag_names = tag_names[42:]
+    reference_cache.invalidate()
 
-    for index, row in df_competitions.iterrows():
+    tag_names = tag_columns()
+
+    for row in df_competitions.to_dict('records'):
         try:
             new_competition = extract_competition_from_row(row)
             new_competition.save()
 
             competition_tags = list()
             for tag in tag_names:
-                if row[tag] == 1:
-                    competition_tags.append(Tag.objects.get(name=tag))
+                if row[tag]:
+                    competition_tags.append(reference_cache.by_name(Tag)[tag])
             new_competition.tags.set(competition_tags)
 
-        except (Organization.DoesNotExist, Category.DoesNotExist, EvaluationMetric.DoesNotExist, Tag.DoesNotExist) as ex:
+        except (Organization.DoesNotExist, Category.DoesNotExist, EvaluationMetric.DoesNotExist, KeyError) as ex:
             logging.debug(ex)
 
 
@@ -0,0 +1,26 @@
+# Generated by Django 4.1.5 on 2026-10-18 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_merge_20230321_1757'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompetitionStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(db_index=True, max_length=50)),
+                ('name', models.CharField(max_length=250)),
+                ('count', models.IntegerField()),
+                ('position', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['kind', 'position'],
+            },
+        ),
+    ]
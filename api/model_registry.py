@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from .data_preprocessing import CAT_FEATURES, TEXT_FEATURES, NUMERIC_FEATURES, tag_features
+from .files import atomic_open
+from .prediction_model import FITTED_MODEL_DIRNAME, MODEL_MANIFEST_FILENAME, ModelChain
+
+MODELS_DIR = 'api/models'
+MANIFEST_FORMAT_VERSION = 1
+
+
+class ModelLayoutError(ValueError):
+    pass
+
+
+class LoadedModel:
+    def __init__(self, model, vocabularies, version: str, loaded_at: datetime, manifest: dict):
+        self.model = model
+        self.vocabularies = vocabularies
+        self.version = version
+        self.loaded_at = loaded_at
+        self.manifest = manifest
+        self.tag_features = tag_features(manifest['feature_names'])
+
+
+def model_layout(model):
+    feature_names = model.feature_names_
+    return {
+        'feature_names': feature_names,
+        'cat_features': [feature_names[i] for i in model.get_cat_feature_indices()],
+        'text_features': [feature_names[i] for i in model.get_text_feature_indices()],
+    }
+
+
+def validate_layout(manifest, chain):
+    if manifest.get('format_version') != MANIFEST_FORMAT_VERSION:
+        raise ModelLayoutError(f"Unsupported model manifest format {manifest.get('format_version')}.")
+    if sorted(manifest['cat_features']) != sorted(CAT_FEATURES) or \
+            sorted(manifest['text_features']) != sorted(TEXT_FEATURES):
+        raise ModelLayoutError("Model categorical or text features do not match the preprocessing pipeline.")
+    missing = set(CAT_FEATURES + TEXT_FEATURES + NUMERIC_FEATURES) - set(manifest['feature_names'])
+    if missing:
+        raise ModelLayoutError(f"Model features {sorted(missing)} are not built by the preprocessing pipeline.")
+    if set(manifest['vocabularies']) != set(CAT_FEATURES):
+        raise ModelLayoutError("Model vocabularies do not cover the categorical features.")
+
+    expected = {key: manifest[key] for key in ('feature_names', 'cat_features', 'text_features')}
+    for position, model in enumerate(chain.models):
+        if model_layout(model) != expected:
+            raise ModelLayoutError(f"Model {manifest['models'][position]} feature layout does not match the manifest.")
+
+
+class ModelRegistry:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MODEL_MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._rejected_version = None
+
+    def _artifact_version(self):
+        stat = os.stat(self.manifest_path)
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _read_manifest(self):
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _load(self, version):
+        manifest = self._read_manifest()
+        paths = [os.path.join(self.directory, file_name) for file_name in manifest['models']]
+        full_trained_at = manifest['full_trained_at']
+        chain = ModelChain.from_files(paths, datetime.fromisoformat(full_trained_at) if full_trained_at else None)
+        validate_layout(manifest, chain)
+
+        vocabularies = {feature: set(names) for feature, names in manifest['vocabularies'].items()}
+        return LoadedModel(chain, vocabularies, version, datetime.now(), manifest)
+
+    def get(self) -> LoadedModel:
+        loaded = self._loaded
+        version = self._artifact_version()
+        if loaded is not None and version in (loaded.version, self._rejected_version):
+            return loaded
+
+        with self._lock:
+            loaded = self._loaded
+            if loaded is None or loaded.version != version:
+                try:
+                    new_loaded = self._load(version)
+                except ModelLayoutError as ex:
+                    if loaded is None:
+                        raise
+                    self._rejected_version = version
+                    print(f"Model {self.manifest_path} version {version} rejected, keeping {loaded.version}: {ex}")
+                    return loaded
+                # A single attribute assignment swaps model, vocabularies, version and load time together.
+                loaded = new_loaded
+                self._loaded = loaded
+                print(f"Model {self.manifest_path} loaded, version {version}.")
+            return loaded
+
+    def get_model(self):
+        return self.get().model
+
+    def publish(self, chain, vocabularies, training_data_hash=None):
+        previous_models = set()
+        if os.path.exists(self.manifest_path):
+            previous_models = set(self._read_manifest()['models'])
+
+        model_files = []
+        for blob in chain.blobs:
+            file_name = f"model-{hashlib.sha256(blob).hexdigest()[:16]}.cbm"
+            path = os.path.join(self.directory, file_name)
+            if not os.path.exists(path):
+                with atomic_open(path, 'wb') as f:
+                    f.write(blob)
+            model_files.append(file_name)
+
+        manifest = dict(model_layout(chain.models[0]),
+                        format_version=MANIFEST_FORMAT_VERSION,
+                        vocabularies=vocabularies,
+                        training_data_hash=training_data_hash,
+                        full_trained_at=chain.full_trained_at.isoformat() if chain.full_trained_at else None,
+                        published_at=datetime.now().isoformat(),
+                        models=model_files)
+        validate_layout(manifest, chain)
+        with atomic_open(self.manifest_path, encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.cbm') and file_name not in previous_models and file_name not in model_files:
+                os.remove(os.path.join(self.directory, file_name))
+
+    def info(self):
+        loaded = self._loaded
+        if loaded is None:
+            return {'path': self.manifest_path, 'version': None, 'loaded_at': None}
+        return {'path': self.manifest_path, 'version': loaded.version, 'loaded_at': loaded.loaded_at.isoformat(),
+                'models': loaded.manifest['models'], 'training_data_hash': loaded.manifest['training_data_hash']}
+
+
+model_registry = ModelRegistry(os.path.join(MODELS_DIR, FITTED_MODEL_DIRNAME))
@@ -137,6 +137,21 @@ class Competition(models.Model):
         )
 
 
+class CompetitionStatistic(models.Model):
+    CATEGORIES = 'categories'
+    ORGANIZATIONS = 'organizations'
+    REWARD_TYPES = 'reward_types'
+    TAGS = 'tags'
+
+    kind = models.CharField(max_length=50, db_index=True)
+    name = models.CharField(max_length=250)
+    count = models.IntegerField()
+    position = models.IntegerField()
+
+    class Meta:
+        ordering = ['kind', 'position']
+
+
 class UserManager(BaseUserManager):
 
     def create_user(self, username, email, password=None):
@@ -0,0 +1,106 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .services import predict_competitions
+
+
+class PredictionRequest:
+    def __init__(self, competitions):
+        self.competitions = competitions
+        self.future = Future()
+
+
+class PredictionBatcher:
+    def __init__(self, predict_batch, max_batch_size=64, max_wait=0.01):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = collections.Counter()
+
+    def submit(self, competitions) -> Future:
+        self._ensure_started()
+        request = PredictionRequest(competitions)
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._process(batch)
+            finally:
+                close_old_connections()
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        size = len(batch[0].competitions)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.competitions)
+        return batch
+
+    def _process(self, batch):
+        # Requests whose callers went away are dropped before any work is done for them.
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            predictions, version = self.predict_batch([c for request in batch for c in request.competitions])
+        except Exception as ex:
+            self._count(errors=1)
+            for request in batch:
+                request.future.set_exception(ex)
+            return
+
+        position = 0
+        for request in batch:
+            request.future.set_result((predictions[position:position + len(request.competitions)], version))
+            position += len(request.competitions)
+        self._count(batches=1, requests=len(batch), competitions=position,
+                    predict_ms=round((time.perf_counter() - start) * 1000))
+
+    def _count(self, **values):
+        with self._lock:
+            self._stats.update(values)
+            if 'requests' in values:
+                self._stats['max_batch_requests'] = max(self._stats['max_batch_requests'], values['requests'])
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        for name in ('batches', 'requests', 'competitions', 'errors', 'predict_ms', 'max_batch_requests'):
+            stats.setdefault(name, 0)
+        stats['queued'] = self._queue.qsize()
+        stats['avg_batch_requests'] = round(stats['requests'] / stats['batches'], 2) if stats['batches'] else 0
+        return stats
+
+
+prediction_batcher = PredictionBatcher(predict_competitions, max_batch_size=settings.PREDICTION_MAX_BATCH_SIZE,
+                                       max_wait=settings.PREDICTION_MAX_WAIT)
@@ -0,0 +1,59 @@
+import collections
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .kaggle_cache import get_cache_backend
+
+
+def feature_row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class PredictionCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._stats = collections.Counter()
+
+    def predict(self, loaded_model, df):
+        features = df[loaded_model.model.feature_names]
+        keys = [f"{loaded_model.version}:{row_hash:016x}" for row_hash in feature_row_hashes(features)]
+        cached = self.backend.get_many(keys)
+
+        missing_rows = sum(key not in cached for key in keys)
+        if missing_rows:
+            # Rows repeated within one call are predicted once.
+            missing = {}
+            for position, key in enumerate(keys):
+                if key not in cached:
+                    missing.setdefault(key, position)
+            values = loaded_model.model.predict(features.iloc[list(missing.values())])
+            fresh = {key: float(value) for key, value in zip(missing, values)}
+            self.backend.set_many(fresh)
+            cached.update(fresh)
+
+        self._count(hits=len(keys) - missing_rows, misses=missing_rows)
+        return np.array([cached[key] for key in keys])
+
+    def _count(self, **values):
+        with self._lock:
+            self._stats.update(values)
+
+    def stats(self):
+        with self._lock:
+            hits = self._stats['hits']
+            misses = self._stats['misses']
+        return {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None}
+
+
+def get_prediction_cache_backend(name, max_entries):
+    if name == 'locmem':
+        return get_cache_backend(name, max_entries=max_entries)
+    return get_cache_backend(name, prefix='prediction')
+
+
+prediction_cache = PredictionCache(get_prediction_cache_backend(settings.PREDICTION_CACHE_BACKEND,
+                                                                settings.PREDICTION_CACHE_MAX_ENTRIES))
@@ -1,8 +1,15 @@
+import mmap
+import os
+import tempfile
+import time
+
+import numpy as np
 from catboost import Pool
 from catboost import CatBoostRegressor
 from sklearn.model_selection import train_test_split
 
-FITTED_MODEL_FILENAME = 'fitted_model.sav'
+FITTED_MODEL_DIRNAME = 'fitted_model'
+MODEL_MANIFEST_FILENAME = 'manifest.json'
 
 
 def split_data(x, y, test_size):
@@ -11,30 +18,149 @@ def split_data(x, y, test_size):
 
 def create_pools(x, y, test_size, cat_features, text_features):
     x_train, x_test, y_train, y_test = split_data(x, y, test_size)
-    train_pool = Pool(
-        x_train, y_train,
-        cat_features=cat_features,
-        text_features=text_features,
-    )
-    validation_pool = Pool(
-        x_test, y_test,
+    train_pool = create_pool(x_train, y_train, cat_features, text_features)
+    validation_pool = create_pool(x_test, y_test, cat_features, text_features)
+    return train_pool, validation_pool
+
+
+def create_pool(x, y, cat_features, text_features, baseline_model=None):
+    return Pool(
+        x, y,
         cat_features=cat_features,
         text_features=text_features,
+        baseline=baseline_model.predict(x) if baseline_model is not None else None,
     )
-    return train_pool, validation_pool
 
 
-def get_model(**kwargs):
+def validation_rmse(model, x, y):
+    return float(np.sqrt(np.mean((model.predict(x) - y) ** 2)))
+
+
+def model_to_bytes(model):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'model.cbm')
+        model.save_model(path, format='cbm')
+        with open(path, 'rb') as f:
+            return f.read()
+
+
+class ModelChain:
+    def __init__(self, models, full_trained_at, blobs=None):
+        self.models = list(models)
+        self.full_trained_at = full_trained_at
+        # CatBoost cannot re-serialize a deserialized model with text features, so the bytes of every member are
+        # kept exactly as they were written right after its training.
+        self.blobs = blobs if blobs is not None else [model_to_bytes(model) for model in self.models]
+
+    @classmethod
+    def from_files(cls, paths, full_trained_at):
+        models = []
+        blobs = []
+        for path in paths:
+            model = CatBoostRegressor()
+            model.load_model(path, format='cbm')
+            models.append(model)
+            # Model files are written once under content-addressed names, so the mapping stays valid; its pages are
+            # only read if the chain is published again.
+            with open(path, 'rb') as f:
+                blobs.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return cls(models, full_trained_at, blobs)
+
+    @property
+    def feature_names(self):
+        return self.models[0].feature_names_
+
+    @property
+    def incremental_updates(self):
+        return len(self.models) - 1
+
+    def extend(self, model):
+        return ModelChain(self.models + [model], self.full_trained_at, self.blobs + [model_to_bytes(model)])
+
+    def predict(self, data):
+        return np.sum([model.predict(data) for model in self.models], axis=0)
+
+
+class TrainingConfig:
+    def __init__(self, iterations=1000, learning_rate=0.05, thread_count=-1, early_stopping_rounds=None,
+                 use_best_model=True, time_budget=None, verbose=100, incremental_iterations=100,
+                 max_incremental_updates=6, full_retrain_days=7, validation_tolerance=0.0):
+        self.iterations = iterations
+        self.learning_rate = learning_rate
+        self.thread_count = thread_count
+        self.early_stopping_rounds = early_stopping_rounds
+        self.use_best_model = use_best_model
+        self.time_budget = time_budget
+        self.verbose = verbose
+        self.incremental_iterations = incremental_iterations
+        self.max_incremental_updates = max_incremental_updates
+        self.full_retrain_days = full_retrain_days
+        self.validation_tolerance = validation_tolerance
+
+    def model_params(self, incremental=False):
+        params = {
+            'iterations': self.incremental_iterations if incremental else self.iterations,
+            'learning_rate': self.learning_rate,
+            'thread_count': self.thread_count,
+            'use_best_model': self.use_best_model,
+        }
+        if self.early_stopping_rounds:
+            params['od_type'] = 'Iter'
+            params['od_wait'] = self.early_stopping_rounds
+        return params
+
+
+class TrainingMonitor:
+    def __init__(self, time_budget=None):
+        self.time_budget = time_budget
+        self.started_at = time.monotonic()
+        self.iterations = 0
+        self.budget_exceeded = False
+
+    def after_iteration(self, info):
+        self.iterations = info.iteration
+        if self.time_budget:
+            self.budget_exceeded = time.monotonic() - self.started_at >= self.time_budget
+        return not self.budget_exceeded
+
+
+class TrainingResult:
+    def __init__(self, wall_time, iterations, best_iteration, best_score, stopped_by):
+        self.wall_time = wall_time
+        self.iterations = iterations
+        self.best_iteration = best_iteration
+        self.best_score = best_score
+        self.stopped_by = stopped_by
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def get_model(config=None, incremental=False, **kwargs):
+    config = config or TrainingConfig()
     return CatBoostRegressor(
-        iterations=1000,
-        learning_rate=0.05,
+        **config.model_params(incremental),
         **kwargs
     )
 
 
-def fit_model(model, train_pool, validation_pool):
+def fit_model(model, train_pool, validation_pool, config=None, incremental=False):
+    config = config or TrainingConfig()
+    monitor = TrainingMonitor(config.time_budget)
+
+    start = time.perf_counter()
     model.fit(
         train_pool,
         eval_set=validation_pool,
-        verbose=100,
+        verbose=config.verbose,
+        callbacks=[monitor],
     )
+    wall_time = time.perf_counter() - start
+
+    stopped_by = 'iterations'
+    if monitor.budget_exceeded:
+        stopped_by = 'time_budget'
+    elif monitor.iterations < config.model_params(incremental)['iterations']:
+        stopped_by = 'early_stopping'
+    return TrainingResult(wall_time, monitor.iterations, model.get_best_iteration(),
+                          model.get_best_score().get('validation'), stopped_by)
@@ -0,0 +1,130 @@
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Category, Organization, EvaluationMetric, RewardType, Tag
+
+
+class ReferenceTable:
+    def __init__(self, instances):
+        self.instances = instances
+        self.by_name = {}
+        for instance in instances:
+            self.by_name.setdefault(instance.name, instance)
+        self.names = list(self.by_name)
+        self.dtos_by_name = {name: instance.to_dto() for name, instance in self.by_name.items()}
+
+
+class ReferenceDataCache:
+    MODELS = (Category, Organization, EvaluationMetric, RewardType, Tag)
+
+    def __init__(self, check_interval=5.0):
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._fingerprint = None
+        self._checked_at = None
+        self._tables = {}
+        self._local = threading.local()
+
+    def fingerprint(self):
+        # Dimension rows are only ever added, so row counts and max ids change whenever another process inserts some.
+        columns = []
+        for model in self.MODELS:
+            table = connection.ops.quote_name(model._meta.db_table)
+            pk = connection.ops.quote_name(model._meta.pk.column)
+            columns.append(f"(SELECT COUNT(*) FROM {table}), (SELECT MAX({pk}) FROM {table})")
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {', '.join(columns)}")
+            return tuple(cursor.fetchone())
+
+    def _check_fingerprint(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        fingerprint = self.fingerprint()
+        self._checked_at = now
+        if fingerprint != self._fingerprint:
+            if self._fingerprint is not None:
+                self._generation += 1
+            self._fingerprint = fingerprint
+            self._tables = {}
+
+    def invalidate(self):
+        if connection.in_atomic_block:
+            # Rows written by an open transaction stay private to its thread until it commits.
+            if self._transaction_tables() is None:
+                callback = self._committed
+                transaction.on_commit(callback)
+                # Django holds the callback only until the transaction ends and discards it on rollback, so a dead
+                # reference means the rows behind the private tables are gone.
+                self._local.callback = weakref.ref(callback)
+            self._local.tables = {}
+            return
+        with self._lock:
+            self._checked_at = None
+            self._tables = {}
+
+    def _committed(self):
+        self._local.tables = None
+        self.invalidate()
+
+    def _transaction_tables(self):
+        tables = getattr(self._local, 'tables', None)
+        if tables is not None and self._local.callback() is None:
+            self._local.tables = None
+            return None
+        return tables
+
+    def table(self, model) -> ReferenceTable:
+        tables = self._transaction_tables()
+        if tables is not None:
+            table = tables.get(model)
+            if table is None:
+                table = ReferenceTable(list(model.objects.order_by('pk')))
+                tables[model] = table
+            return table
+
+        with self._lock:
+            self._check_fingerprint()
+            table = self._tables.get(model)
+            if table is None:
+                table = ReferenceTable(list(model.objects.order_by('pk')))
+                self._tables[model] = table
+            return table
+
+    def instances(self, model):
+        return self.table(model).instances
+
+    def by_name(self, model):
+        return self.table(model).by_name
+
+    def names(self, model):
+        return self.table(model).names
+
+    def dtos_by_name(self, model):
+        return self.table(model).dtos_by_name
+
+    def get_or_create_many(self, model, names):
+        names = list(dict.fromkeys(str(name) for name in names))
+        with self._lock:
+            existing = self.by_name(model)
+            missing = [name for name in names if name not in existing]
+            if missing:
+                model.objects.bulk_create([model(name=name) for name in missing])
+                self.invalidate()
+                existing = self.by_name(model)
+            return {name: existing[name] for name in names}
+
+    def get_or_create(self, model, name):
+        return self.get_or_create_many(model, [name])[str(name)]
+
+    def info(self):
+        return {'generation': self._generation, 'fingerprint': self._fingerprint,
+                'loaded_tables': [model.__name__ for model in self._tables]}
+
+
+reference_cache = ReferenceDataCache(settings.REFERENCE_DATA_CHECK_INTERVAL)
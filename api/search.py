@@ -0,0 +1,147 @@
+import bisect
+import collections
+import threading
+
+from .data_preprocessing import REWARD_CURRENCIES
+
+
+def title_trigrams(title):
+    return {title[i:i + 3] for i in range(len(title) - 2)}
+
+
+def reward_type_keys(reward):
+    reward = reward.lower()
+    keys = {reward}
+    for prefix, currency in REWARD_CURRENCIES.items():
+        if reward.startswith(prefix):
+            keys.add(currency.lower())
+    return keys
+
+
+class IndexedCompetition:
+    def __init__(self, competition):
+        self.competition = competition
+        self.id = competition.id
+        self.title = competition.title.lower()
+        self.category = competition.category.lower()
+        self.reward_types = reward_type_keys(competition.reward)
+        self.tags = {t.name.lower() for t in competition.tags}
+        self.deadline = competition.deadline
+        self.trigrams = title_trigrams(self.title)
+
+    def key(self):
+        return self.title, self.category, self.reward_types, self.tags, self.deadline
+
+
+class CompetitionSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source = None
+        self._entries = {}
+        self._positions = {}
+        self._trigrams = collections.defaultdict(set)
+        self._categories = collections.defaultdict(set)
+        self._reward_types = collections.defaultdict(set)
+        self._tags = collections.defaultdict(set)
+        self._deadlines = []
+
+    def refresh(self, source, competitions):
+        with self._lock:
+            if source == self._source:
+                return
+            self._update(competitions)
+            self._source = source
+
+    def _update(self, competitions):
+        indexed = {}
+        for competition in competitions:
+            if competition.id not in indexed:
+                indexed[competition.id] = IndexedCompetition(competition)
+
+        for competition_id in list(self._entries):
+            new_entry = indexed.get(competition_id)
+            if new_entry is None or new_entry.key() != self._entries[competition_id].key():
+                self._remove(competition_id)
+
+        for competition_id, entry in indexed.items():
+            if competition_id in self._entries:
+                self._entries[competition_id] = entry
+            else:
+                self._add(entry)
+
+        self._positions = {competition_id: position for position, competition_id in enumerate(indexed)}
+
+    def _add(self, entry):
+        self._entries[entry.id] = entry
+        for trigram in entry.trigrams:
+            self._trigrams[trigram].add(entry.id)
+        self._categories[entry.category].add(entry.id)
+        for reward_type in entry.reward_types:
+            self._reward_types[reward_type].add(entry.id)
+        for tag in entry.tags:
+            self._tags[tag].add(entry.id)
+        bisect.insort(self._deadlines, (entry.deadline, entry.id))
+
+    def _remove(self, competition_id):
+        entry = self._entries.pop(competition_id)
+        for trigram in entry.trigrams:
+            self._discard(self._trigrams, trigram, competition_id)
+        self._discard(self._categories, entry.category, competition_id)
+        for reward_type in entry.reward_types:
+            self._discard(self._reward_types, reward_type, competition_id)
+        for tag in entry.tags:
+            self._discard(self._tags, tag, competition_id)
+        del self._deadlines[bisect.bisect_left(self._deadlines, (entry.deadline, competition_id))]
+
+    @staticmethod
+    def _discard(index, key, competition_id):
+        ids = index[key]
+        ids.discard(competition_id)
+        if not ids:
+            del index[key]
+
+    def search(self, title=None, categories=None, reward_types=None, deadline_before=None, deadline_after=None,
+               tags=None):
+        with self._lock:
+            candidates = []
+
+            if categories is not None:
+                candidates.append(self._union(self._categories, categories))
+            if reward_types is not None:
+                candidates.append(self._union(self._reward_types, reward_types))
+            if tags is not None:
+                candidates.append(self._intersection(self._tags, tags))
+            if deadline_before is not None or deadline_after is not None:
+                candidates.append(self._deadline_range(deadline_before, deadline_after))
+            if title is not None and len(title) >= 3:
+                candidates.append(self._intersection(self._trigrams, title_trigrams(title.lower())))
+
+            ids = set.intersection(*candidates) if candidates else set(self._entries)
+            if title is not None:
+                ids = {competition_id for competition_id in ids if title.lower() in self._entries[competition_id].title}
+
+            return [self._entries[competition_id].competition for competition_id in
+                    sorted(ids, key=self._positions.__getitem__)]
+
+    @staticmethod
+    def _union(index, keys):
+        ids = set()
+        for key in keys:
+            ids |= index.get(key.lower(), set())
+        return ids
+
+    def _intersection(self, index, keys):
+        postings = sorted((index.get(key.lower(), set()) for key in keys), key=len)
+        return set.intersection(*postings) if postings else set(self._entries)
+
+    def _deadline_range(self, deadline_before, deadline_after):
+        start = 0
+        end = len(self._deadlines)
+        if deadline_after is not None:
+            start = bisect.bisect_left(self._deadlines, (deadline_after,))
+        if deadline_before is not None:
+            end = bisect.bisect_left(self._deadlines, (deadline_before, float('inf')))
+        return {competition_id for _, competition_id in self._deadlines[start:end]}
+
+
+active_competitions_index = CompetitionSearchIndex()
@@ -140,6 +140,28 @@ class CompetitionDtoSerializer(serializers.Serializer):
     tags_dto = TagDtoSerializer(many=True)
 
 
+class CompetitionPredictionSerializer(serializers.Serializer):
+    kaggle_id = serializers.IntegerField(required=False, allow_null=True, default=None)
+    title = serializers.CharField()
+    description = serializers.CharField(allow_blank=True, default='')
+    category = serializers.CharField(allow_blank=True, default='')
+    organization_name = serializers.CharField(allow_blank=True, allow_null=True, default=None)
+    evaluation_metric = serializers.CharField(allow_blank=True, default='')
+    max_daily_submissions = serializers.IntegerField(min_value=0)
+    max_team_size = serializers.IntegerField(min_value=1)
+    reward = serializers.CharField(allow_blank=True, default='Knowledge')
+    enabled_date = serializers.DateTimeField()
+    deadline = serializers.DateTimeField()
+    merger_deadline = serializers.DateTimeField(allow_null=True, default=None)
+    new_entrant_deadline = serializers.DateTimeField(allow_null=True, default=None)
+    tags = serializers.ListField(child=serializers.CharField(), default=list)
+
+    def validate(self, attrs):
+        if attrs['deadline'] < attrs['enabled_date']:
+            raise serializers.ValidationError({'error': 'The deadline should not be earlier than the enabled date'})
+        return attrs
+
+
 class EmailVerifySerializer(serializers.ModelSerializer):
     code = serializers.CharField(max_length=100)
 
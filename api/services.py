@@ -1,103 +1,86 @@
-import re
 import pandas as pd
-import collections
-import joblib
+from django.db import transaction
+from django.db.models import Count
 
-from api.kaggle_api import api
-from .dto import TagDto
-from .models import Tag, Category, Competition, Organization, RewardType
-from .utils import extract_active_competition_from_row
-from .data_preprocessing import preprocess_active_competitions
-from .prediction_model import FITTED_MODEL_FILENAME
+from api.kaggle_api import cached_api
+from .dto import TagDto, CategoryDto, OrganizationDto, EvaluationMetricDto, RewardTypeDto, CompetitionDto
+from .models import Tag, Category, Organization, RewardType, EvaluationMetric, CompetitionStatistic
+from .reference_cache import reference_cache
+from .data_preprocessing import preprocess_active_competitions, encode_tags, parse_rewards, tag_positions
+from .model_registry import model_registry
+from .prediction_cache import prediction_cache
+from .search import active_competitions_index
 
+ACTIVE_COMPETITION_COLUMNS = ['id', 'title', 'description', 'category', 'organizationname', 'evaluationmetric',
+                              'maxdailysubmissions', 'maxteamsize', 'rewardtype', 'rewardquantity', 'enableddate',
+                              'deadline']
 
-def get_competitions_categories_stats():
-    categories = Category.objects.all()
-    dictionary = {}
-
-    for category in categories:
-        dictionary[category.name] = len(Competition.objects.filter(category=category))
+COMPETITIONS_STATISTICS = {
+    CompetitionStatistic.CATEGORIES: (Category, ['id'], None),
+    CompetitionStatistic.ORGANIZATIONS: (Organization, ['-competitions_count', 'id'], 10),
+    CompetitionStatistic.REWARD_TYPES: (RewardType, ['id'], None),
+    CompetitionStatistic.TAGS: (Tag, ['-competitions_count', 'id'], 10),
+}
 
-    return dictionary
 
+def count_competitions_by_dimension(model, order_by, limit=None):
+    queryset = model.objects.annotate(competitions_count=Count('competition')).order_by(*order_by)
+    if limit is not None:
+        queryset = queryset[:limit]
+    return list(queryset.values_list('name', 'competitions_count'))
 
-def get_competitions_organizations_stats():
-    organizations = Organization.objects.all()
-    counter = collections.Counter()
 
-    for organization in organizations:
-        counter[organization.name] = len(Competition.objects.filter(organization=organization))
+def compute_competitions_statistics(kind):
+    model, order_by, limit = COMPETITIONS_STATISTICS[kind]
+    return count_competitions_by_dimension(model, order_by, limit)
 
-    return dict(counter.most_common(10))
 
+@transaction.atomic
+def refresh_competitions_statistics():
+    statistics = []
+    for kind in COMPETITIONS_STATISTICS:
+        for position, (name, count) in enumerate(compute_competitions_statistics(kind)):
+            statistics.append(CompetitionStatistic(kind=kind, name=name, count=count, position=position))
 
-def get_competitions_reward_type_stats():
-    reward_types = RewardType.objects.all()
-    dictionary = {}
-
-    for reward_type in reward_types:
-        dictionary[reward_type.name] = len(Competition.objects.filter(rewardType=reward_type))
-
-    return dictionary
-
-
-def get_competitions_tags_stats():
-    tags = Tag.objects.all()
-    counter = collections.Counter()
+    CompetitionStatistic.objects.all().delete()
+    CompetitionStatistic.objects.bulk_create(statistics)
 
-    for tag in tags:
-        counter[tag.name] = len(Competition.objects.filter(tags__id=tag.id))
 
-    return dict(counter.most_common(10))
+def get_competitions_statistics(kind):
+    statistics = CompetitionStatistic.objects.filter(kind=kind).values_list('name', 'count')
+    if not statistics:
+        statistics = compute_competitions_statistics(kind)
+    return dict(statistics)
 
 
-def get_active_competitions():
-    api_competitions = api.competitions_list()
-    return api_competitions
-
-
-def get_filtered_active_competitions(title=None, categories=None, reward_types=None, deadline_before=None,
-                                     deadline_after=None, tags=None):
-    competitions = api.competitions_list()
-
-    if title is not None:
-        competitions = [c for c in competitions if title.lower() in c.title.lower()]
+def get_competitions_categories_stats():
+    return get_competitions_statistics(CompetitionStatistic.CATEGORIES)
 
-    if categories is not None:
-        competitions = [c for c in competitions if contains_category(c.category.lower(), categories)]
 
-    if reward_types is not None:
-        competitions = [c for c in competitions if contains_reward_type(c.reward.lower(), reward_types)]
+def get_competitions_organizations_stats():
+    return get_competitions_statistics(CompetitionStatistic.ORGANIZATIONS)
 
-    if deadline_before is not None:
-        competitions = [c for c in competitions if deadline_before >= c.deadline]
 
-    if deadline_after is not None:
-        competitions = [c for c in competitions if deadline_after <= c.deadline]
+def get_competitions_reward_type_stats():
+    return get_competitions_statistics(CompetitionStatistic.REWARD_TYPES)
 
-    if tags is not None:
-        competitions = [c for c in competitions if
-                        all(tag.lower() in map(lambda t: t.name.lower(), c.tags) for tag in tags)]
 
-    return competitions
+def get_competitions_tags_stats():
+    return get_competitions_statistics(CompetitionStatistic.TAGS)
 
 
-def contains_category(category, categories):
-    for c in categories:
-        if c.lower() == category.lower():
-            return True
-    return False
+def get_active_competitions():
+    api_competitions = cached_api.competitions_list()
+    return api_competitions
 
 
-def contains_reward_type(reward_type, reward_types):
-    for rt in reward_types:
-        if rt.lower() == reward_type.lower():
-            return True
-        if rt.lower() == "usd" and reward_type.lower().startswith("$"):
-            return True
-        if rt.lower() == "eur" and reward_type.lower().startswith("€"):
-            return True
-    return False
+def get_filtered_active_competitions(title=None, categories=None, reward_types=None, deadline_before=None,
+                                     deadline_after=None, tags=None, entry=None):
+    if entry is None:
+        entry = cached_api.competitions_list_entry()
+    active_competitions_index.refresh(entry.fetched_at, entry.value)
+    return active_competitions_index.search(title=title, categories=categories, reward_types=reward_types,
+                                            deadline_before=deadline_before, deadline_after=deadline_after, tags=tags)
 
 
 def active_competitions_to_dto_list(df_competitions):
@@ -108,40 +91,74 @@ def active_competitions_to_dto_list(df_competitions):
 
     predictions = get_total_competitors_prediction(df_competitions)
 
-    for index, row in df_competitions.iterrows():
-        new_competition_dto = extract_active_competition_from_row(row).to_dto()
-        new_competition_dto.set_prediction(predictions[index])
-
-        competition_tags = list()
-        for tag in tag_names:
-            if row[tag] == 1:
-                try:
-                    c_tag = Tag.objects.get(name=tag).to_dto()
-                except Tag.DoesNotExist:
-                    c_tag = TagDto(sid=0, kaggle_id=0, name=tag)
-                competition_tags.append(c_tag)
-
-        new_competition_dto.tags_dto = competition_tags
+    categories = reference_cache.dtos_by_name(Category)
+    organizations = reference_cache.dtos_by_name(Organization)
+    evaluation_metrics = reference_cache.dtos_by_name(EvaluationMetric)
+    reward_types = reference_cache.dtos_by_name(RewardType)
+    tags = reference_cache.dtos_by_name(Tag)
+
+    tags_dto = [tags.get(tag, TagDto(sid=0, kaggle_id=0, name=tag)) for tag in tag_names]
+    competitions_tags = [[] for _ in range(len(df_competitions))]
+    rows, columns = tag_positions(df_competitions, tag_names)
+    for row, column in zip(rows, columns):
+        competitions_tags[row].append(tags_dto[column])
+
+    records = df_competitions[ACTIVE_COMPETITION_COLUMNS].to_dict('records')
+    for position, row in enumerate(records):
+        new_competition_dto = CompetitionDto(
+            sid=None,
+            kaggle_id=row['id'],
+            title=row['title'],
+            description=row['description'],
+            category_dto=categories.get(row['category'], CategoryDto(sid=None, name=row['category'])),
+            organization_dto=organizations.get(row['organizationname'],
+                                               OrganizationDto(sid=None, kaggle_id=None,
+                                                               name=row['organizationname'])),
+            evaluation_metric_dto=evaluation_metrics.get(row['evaluationmetric'],
+                                                         EvaluationMetricDto(sid=None, name=row['evaluationmetric'])),
+            max_daily_submissions=int(row['maxdailysubmissions']),
+            max_team_size=int(row['maxteamsize']),
+            reward_type_dto=reward_types.get(row['rewardtype'], RewardTypeDto(sid=None, name=row['rewardtype'])),
+            reward_quantity=int(row['rewardquantity']),
+            total_teams=None,
+            total_competitors=None,
+            total_submissions=None,
+            enabled_date=row['enableddate'],
+            deadline=row['deadline'],
+            tags_dto=competitions_tags[position])
+        new_competition_dto.set_prediction(predictions[position])
         competitions.append(new_competition_dto)
 
     return competitions
 
 
-def get_total_competitors_prediction(df_competitions):
+def get_total_competitors_prediction(df_competitions, loaded_model=None):
     df = df_competitions.copy()
-    preprocess_active_competitions(df)
-    model = joblib.load(f"api/models/{FITTED_MODEL_FILENAME}")
-    predictions = model.predict(df)
+    if loaded_model is None:
+        loaded_model = model_registry.get()
+    preprocess_active_competitions(df, loaded_model.vocabularies)
+    predictions = prediction_cache.predict(loaded_model, df)
     predictions = [int(x) for x in predictions]
     return predictions
 
 
-def api_competitions_to_df(competitions):
-    api_competitions = competitions
-    comp_list = []
-    for c in api_competitions:
-        comp_list.append(vars(c))
+def predict_competitions(competitions):
+    loaded_model = model_registry.get()
+    records = [{'id': c['kaggle_id'], 'title': c['title'], 'description': c['description'],
+                'category': c['category'], 'organizationname': c['organization_name'],
+                'evaluationmetric': c['evaluation_metric'], 'maxdailysubmissions': c['max_daily_submissions'],
+                'maxteamsize': c['max_team_size'], 'reward': c['reward'], 'deadline': c['deadline'],
+                'enableddate': c['enabled_date'], 'tags': c['tags'], 'mergerdeadline': c['merger_deadline'],
+                'newentrantdeadline': c['new_entrant_deadline']} for c in competitions]
+    df_competitions = competition_records_to_df(records, loaded_model)
+    return get_total_competitors_prediction(df_competitions, loaded_model), loaded_model.version
 
+
+def api_competitions_to_df(competitions, loaded_model=None):
+    return competition_records_to_df([vars(c) for c in competitions], loaded_model)
+
+
+def competition_records_to_df(comp_list, loaded_model=None):
     feature_names = ['title', 'description', 'category', 'organizationname', 'evaluationmetric', 'maxdailysubmissions',
                      'maxteamsize', 'reward', 'deadline', 'enableddate', 'tags', 'id', 'mergerdeadline',
                      'newentrantdeadline']
@@ -150,35 +167,15 @@ def api_competitions_to_df(competitions):
     active_df.columns = map(str.lower, active_df.columns)
     active_df = pd.DataFrame(active_df, columns=feature_names)
 
-    reward_type = []
-    reward_quantity = []
-    for index, row in active_df.iterrows():
-
-        if re.match(r'(\$)', row['reward']):
-            s = re.match(r'(?:\$)(.+)', row['reward']).group(1).replace(',', '')
-            reward_type.append('USD')
-            reward_quantity.append(int(s))
-
-        elif re.match(r'(\€)', row['reward']):
-            s = re.match(r'(?:€)(.+)', row['reward']).group(1).replace(',', '')
-            reward_type.append('EUR')
-            reward_quantity.append(int(s))
-
-        else:
-            reward_type.append(row['reward'])
-            reward_quantity.append(0)
-
+    reward_type, reward_quantity = parse_rewards(active_df['reward'])
     active_df.insert(loc=7, column='rewardtype', value=reward_type)
     active_df.insert(loc=8, column='rewardquantity', value=reward_quantity)
 
-    tags_names = map(lambda t: t.name, Tag.objects.all())
-
-    for tag in tags_names:
-        tag_list = []
-        for index, row in active_df.iterrows():
-            row['tags'] = map(lambda t: str(t), row['tags'])
-            tag_list.append(1 if tag in row['tags'] else 0)
-        active_df[tag] = tag_list
+    if loaded_model is None:
+        loaded_model = model_registry.get()
+    # Tags the model was trained on are encoded even when the Tag table does not know them yet.
+    tags_names = list(dict.fromkeys(reference_cache.names(Tag) + loaded_model.tag_features))
+    active_df = pd.concat([active_df, encode_tags(active_df['tags'], tags_names)], axis=1)
 
     active_df.drop(columns=['tags', 'reward'], inplace=True)
     return active_df
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from datetime import datetime
+
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+
+from .kaggle_api import cached_api
+from .model_registry import model_registry
+from .serializers import CompetitionDtoSerializer
+from .services import api_competitions_to_df, active_competitions_to_dto_list
+
+
+class Snapshot:
+    def __init__(self, version: int, source, payload: bytes):
+        self.version = version
+        self.source = source
+        self.payload = payload
+        self.etag = f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+        self.built_at = datetime.now()
+
+
+def build_active_competitions_payload(competitions):
+    active_competitions_df = api_competitions_to_df(competitions)
+    active_competitions = active_competitions_to_dto_list(active_competitions_df)
+    serializer = CompetitionDtoSerializer(active_competitions, many=True)
+    return JSONRenderer().render(serializer.data)
+
+
+class ActiveCompetitionsSnapshotStore:
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._building = False
+
+    def get(self, entry=None) -> Snapshot:
+        if entry is None:
+            entry = cached_api.competitions_list_entry()
+        source = (entry.fetched_at, model_registry.get().version)
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._build(entry, source)
+                return self._snapshot
+
+        if snapshot.source != source:
+            self._build_in_background(entry, source)
+        return snapshot
+
+    def _build(self, entry, source):
+        payload = build_active_competitions_payload(entry.value)
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        self._snapshot = Snapshot(version, source, payload)
+        print(f"Active competitions snapshot {version} built.")
+
+    def _build_in_background(self, entry, source):
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        threading.Thread(target=self._rebuild, args=(entry, source), daemon=True).start()
+
+    def _rebuild(self, entry, source):
+        try:
+            self._build(entry, source)
+        except Exception as ex:
+            print(f"Active competitions snapshot rebuild failed: {ex}")
+        finally:
+            # The thread ends here, so its connections are closed rather than left to the garbage collector.
+            connections.close_all()
+            with self._lock:
+                self._building = False
+
+    def info(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'version': None, 'etag': None, 'built_at': None}
+        return {'version': snapshot.version, 'etag': snapshot.etag, 'built_at': snapshot.built_at.isoformat()}
+
+
+active_competitions_snapshots = ActiveCompetitionsSnapshotStore()
@@ -1,3 +1,201 @@
-from django.test import TestCase
+import threading
+import time
 
-# Create your tests here.
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from .fake_kaggle_api import FakeKaggleApi, FakeTag, make_competition
+from .kaggle_cache import CachedKaggleApi, LocMemBackend
+from .kaggle_pagination import CompetitionsFetcher
+from .model_registry import model_registry
+from .models import Organization, Tag
+from .reference_cache import reference_cache
+from .services import api_competitions_to_df, active_competitions_to_dto_list
+
+
+def fake_competitions(count):
+    categories = ['Featured', 'Research', 'Playground', 'Getting Started']
+    rewards = ['$25,000', '€1,000', 'Knowledge', 'Swag']
+    return [make_competition(id=i, ref=f'competition-{i}', title=f'Competition {i}', description='Predict things',
+                             category=categories[i % 4], organizationName='Kaggle' if i % 2 else f'Org {i}',
+                             reward=rewards[i % 4], tags=['tabular', 'image'][:i % 3], evaluationMetric='RMSE',
+                             deadline='2030-03-01T23:59:00Z', enabledDate='2030-01-01T00:00:00Z')
+            for i in range(count)]
+
+
+class ActiveCompetitionsDtoQueriesTest(TransactionTestCase):
+    # Requests run outside a transaction, so a cold cache costs the fingerprint check plus one load per dimension
+    # table, independent of the number of competitions.
+    COLD_QUERIES = 1 + len(reference_cache.MODELS)
+
+    def assert_dto_queries(self, count):
+        df = api_competitions_to_df(fake_competitions(count))
+
+        reference_cache.invalidate()
+        with self.assertNumQueries(self.COLD_QUERIES):
+            competitions = active_competitions_to_dto_list(df)
+        with self.assertNumQueries(0):
+            active_competitions_to_dto_list(df)
+        self.assertEqual(len(competitions), count)
+
+    def test_dto_queries_for_4_competitions(self):
+        self.assert_dto_queries(4)
+
+    def test_dto_queries_for_40_competitions(self):
+        self.assert_dto_queries(40)
+
+
+class ReferenceCacheTransactionsTest(TransactionTestCase):
+    def setUp(self):
+        reference_cache.invalidate()
+
+    def test_committed_rows_reach_the_shared_cache(self):
+        with transaction.atomic():
+            organization = reference_cache.get_or_create(Organization, 'Committed Org')
+            self.assertEqual(reference_cache.by_name(Organization)['Committed Org'].pk, organization.pk)
+
+        self.assertEqual(reference_cache.by_name(Organization)['Committed Org'].pk, organization.pk)
+
+    def test_rolled_back_rows_are_dropped(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                reference_cache.get_or_create(Organization, 'Phantom Org')
+                raise RuntimeError
+
+        self.assertNotIn('Phantom Org', reference_cache.by_name(Organization))
+        with transaction.atomic():
+            self.assertNotIn('Phantom Org', reference_cache.by_name(Organization))
+
+    def test_rows_of_a_rolled_back_savepoint_are_dropped(self):
+        with transaction.atomic():
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    reference_cache.get_or_create(Organization, 'Savepoint Org')
+                    raise RuntimeError
+            self.assertNotIn('Savepoint Org', reference_cache.by_name(Organization))
+
+            organization = reference_cache.get_or_create(Organization, 'Savepoint Org')
+            self.assertTrue(Organization.objects.filter(pk=organization.pk).exists())
+
+
+class ModelTagFeaturesTest(TestCase):
+    def test_model_tags_are_encoded_without_tag_rows(self):
+        Tag.objects.all().delete()
+        reference_cache.invalidate()
+        model_tag = model_registry.get().tag_features[0]
+        competitions = fake_competitions(3)
+        for competition in competitions:
+            competition.tags = []
+        competitions[1].tags = [FakeTag(model_tag, model_tag)]
+
+        df = api_competitions_to_df(competitions)
+        dtos = active_competitions_to_dto_list(df)
+
+        self.assertEqual(df[model_tag].sparse.to_dense().tolist(), [0, 1, 0])
+        self.assertEqual([[tag.name for tag in dto.tags_dto] for dto in dtos], [[], [model_tag], []])
+
+
+class CachedKaggleApiTest(SimpleTestCase):
+    def cached_api(self, ttl=60, latency=0.0):
+        api = FakeKaggleApi(fake_competitions(4), latency=latency)
+        return api, CachedKaggleApi(api, LocMemBackend(), ttl, fetcher=CompetitionsFetcher(max_workers=1))
+
+    def wait_for_refresh(self, cached_api):
+        deadline = time.monotonic() + 5
+        while cached_api._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_fresh_entry_is_served_from_cache(self):
+        api, cached_api = self.cached_api()
+        first = cached_api.competitions_list_entry()
+        second = cached_api.competitions_list_entry()
+
+        self.assertIs(first, second)
+        self.assertEqual([c.id for c in second.value], [0, 1, 2, 3])
+        self.assertEqual(api.calls, 2)
+        self.assertEqual(cached_api.stats(), {'hits': 1, 'stale_hits': 0, 'misses': 1, 'fetches': 1,
+                                              'refresh_errors': 0})
+
+    def test_stale_entry_is_served_while_a_single_refresh_runs(self):
+        api, cached_api = self.cached_api(ttl=0.05, latency=0.1)
+        stale = cached_api.competitions_list_entry()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        entries = [cached_api.competitions_list_entry() for _ in range(5)]
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertTrue(all(entry is stale for entry in entries))
+
+        self.wait_for_refresh(cached_api)
+        refreshed = cached_api.competitions_list_entry()
+        self.assertIsNot(refreshed, stale)
+        self.assertGreater(refreshed.fetched_at, stale.fetched_at)
+        stats = cached_api.stats()
+        self.assertEqual(stats['stale_hits'], 5)
+        self.assertEqual(stats['fetches'], 2)
+
+    def test_failed_refresh_keeps_the_stale_entry(self):
+        api, cached_api = self.cached_api(ttl=0.01)
+        stale = cached_api.competitions_list_entry()
+        time.sleep(0.02)
+        api.competitions_list = lambda **kwargs: 1 / 0
+
+        for _ in range(2):
+            self.assertIs(cached_api.competitions_list_entry(), stale)
+            self.wait_for_refresh(cached_api)
+        self.assertEqual(cached_api.stats()['refresh_errors'], 2)
+
+    def test_concurrent_misses_share_one_upstream_fetch(self):
+        api, cached_api = self.cached_api(latency=0.1)
+        entries = []
+        threads = [threading.Thread(target=lambda: entries.append(cached_api.competitions_list_entry()))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(entry) for entry in entries}), 1)
+        self.assertEqual(api.calls, 2)
+        stats = cached_api.stats()
+        self.assertEqual((stats['misses'], stats['hits'], stats['fetches']), (1, 9, 1))
+
+
+class CompetitionsFetcherTest(SimpleTestCase):
+    def test_stops_at_first_empty_page(self):
+        api = FakeKaggleApi(fake_competitions(45), page_size=10)
+        competitions = CompetitionsFetcher(max_workers=1).fetch_all(api)
+
+        self.assertEqual([c.id for c in competitions], list(range(45)))
+        self.assertEqual(api.calls, 6)
+
+    def test_duplicate_competitions_are_dropped(self):
+        # Pages shift while being read, so a competition can show up on two consecutive pages.
+        api = FakeKaggleApi(fake_competitions(5) + fake_competitions(8)[3:], page_size=5)
+        competitions = CompetitionsFetcher().fetch_all(api)
+
+        self.assertEqual([c.id for c in competitions], list(range(8)))
+
+    def test_stops_after_max_pages(self):
+        api = FakeKaggleApi(fake_competitions(100), page_size=10)
+        competitions = CompetitionsFetcher(max_workers=2, max_pages=3).fetch_all(api)
+
+        self.assertEqual([c.id for c in competitions], list(range(30)))
+        self.assertEqual(api.calls, 3)
+
+    def test_slow_page_times_out(self):
+        api = FakeKaggleApi(fake_competitions(4), latency=0.5)
+        fetcher = CompetitionsFetcher(max_workers=2, page_timeout=0.05)
+
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            fetcher.fetch_all(api)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_pages_are_fetched_concurrently(self):
+        api = FakeKaggleApi(fake_competitions(30), latency=0.1, page_size=10, pages=3)
+
+        start = time.monotonic()
+        competitions = CompetitionsFetcher(max_workers=4).fetch_all(api)
+        self.assertEqual(len(competitions), 30)
+        self.assertLess(time.monotonic() - start, 0.3)
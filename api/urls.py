@@ -19,7 +19,7 @@ from rest_framework_simplejwt.views import TokenRefreshView
 from .views import SignUpView, competitions_view, EmailVerifyView, SignInView, competitions_search_view, \
     competitions_categories_view, competitions_reward_types_view, competitions_tags_view, \
     competitions_categories_stat_view, competitions_organizations_stat_view, competitions_reward_type_stat_view, \
-    competitions_tags_stat_view
+    competitions_tags_stat_view, metrics_view, competitions_predict_view
 
 urlpatterns = [
     path('sign-up', SignUpView.as_view()),
@@ -27,6 +27,7 @@ urlpatterns = [
     path('refresh-token', TokenRefreshView.as_view()),
     path('competitions/active', competitions_view),
     path('competitions/active/search', competitions_search_view),
+    path('competitions/predict', competitions_predict_view),
     path('competitions/categories', competitions_categories_view),
     path('competitions/reward-types', competitions_reward_types_view),
     path('competitions/tags', competitions_tags_view),
@@ -34,5 +35,6 @@ urlpatterns = [
     path('competitions/statistics/categories', competitions_categories_stat_view),
     path('competitions/statistics/organizations', competitions_organizations_stat_view),
     path('competitions/statistics/rewardtypes', competitions_reward_type_stat_view),
-    path('competitions/statistics/tags', competitions_tags_stat_view)
+    path('competitions/statistics/tags', competitions_tags_stat_view),
+    path('metrics', metrics_view)
 ]
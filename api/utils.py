@@ -6,6 +6,7 @@ from datetime import datetime
 from django.core.mail import EmailMessage
 
 from api.models import Organization, Competition, Category, EvaluationMetric, RewardType
+from api.reference_cache import reference_cache
 
 
 def extract_competition_from_row(row):
@@ -16,21 +17,18 @@ def extract_competition_from_row(row):
 
     organization = None
     if str(row['OrganizationName']) != "nan":
-        Organization.objects.get_or_create(name=row['OrganizationName'])
-        organization = Organization.objects.get(name=row['OrganizationName'])
-    Category.objects.get_or_create(name=row['HostSegmentTitle'])
-    EvaluationMetric.objects.get_or_create(name=row['EvaluationAlgorithmName'])
-    RewardType.objects.get_or_create(name=row['RewardType'])
+        organization = reference_cache.get_or_create(Organization, row['OrganizationName'])
 
     new_competition = Competition(kaggle_id=row['Id'],
                                   title=row['Title'],
                                   description=row['Subtitle'],
-                                  category=Category.objects.get(name=row['HostSegmentTitle']),
+                                  category=reference_cache.get_or_create(Category, row['HostSegmentTitle']),
                                   organization=organization,
-                                  evaluationMetric=EvaluationMetric.objects.get(name=row['EvaluationAlgorithmName']),
+                                  evaluationMetric=reference_cache.get_or_create(EvaluationMetric,
+                                                                                 row['EvaluationAlgorithmName']),
                                   maxDailySubmissions=int(row['MaxDailySubmissions']),
                                   maxTeamSize=int(row['MaxTeamSize']),
-                                  rewardType=RewardType.objects.get(name=row['RewardType']),
+                                  rewardType=reference_cache.get_or_create(RewardType, row['RewardType']),
                                   rewardQuantity=int(row['RewardQuantity']) if not math.isnan(
                                       row['RewardQuantity']) else 0,
                                   totalTeams=int(row['TotalTeams']),
@@ -41,37 +39,6 @@ def extract_competition_from_row(row):
     return new_competition
 
 
-def extract_active_competition_from_row(row):
-    try:
-        category = Category.objects.get(name=row['category'])
-    except Category.DoesNotExist:
-        category = Category(name=row['category'])
-    try:
-        organization = Organization.objects.get(name=row['organizationname'])
-    except Organization.DoesNotExist:
-        organization = Organization(name=row['organizationname'])
-    try:
-        evaluation_metric = EvaluationMetric.objects.get(name=row['evaluationmetric'])
-    except EvaluationMetric.DoesNotExist:
-        evaluation_metric = EvaluationMetric(name=row['evaluationmetric'])
-    try:
-        reward_type = RewardType.objects.get(name=row['rewardtype'])
-    except RewardType.DoesNotExist:
-        reward_type = RewardType(name=row['rewardtype'])
-    return Competition(kaggle_id=row['id'],
-                       title=row['title'],
-                       description=row['description'],
-                       category=category,
-                       organization=organization,
-                       evaluationMetric=evaluation_metric,
-                       maxDailySubmissions=int(row['maxdailysubmissions']),
-                       maxTeamSize=int(row['maxteamsize']),
-                       rewardType=reward_type,
-                       rewardQuantity=int(row['rewardquantity']),
-                       enabledDate=row['enableddate'],
-                       deadline=row['deadline'])
-
-
 class Util:
     @staticmethod
     def send_email(data):
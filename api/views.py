@@ -1,19 +1,31 @@
+import asyncio
+import json
 import logging
 import os
 from datetime import datetime
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse
+from django.utils.http import parse_etags
 from rest_framework import generics, status
 from rest_framework.decorators import permission_classes, api_view
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from api.serializers import SignUpSerializer, EmailVerifySerializer, SignInSerializer, CompetitionDtoSerializer, \
-    CategorySerializer, RewardTypeSerializer, TagSerializer
+    CategorySerializer, RewardTypeSerializer, TagSerializer, CompetitionPredictionSerializer
+from .async_support import async_api_view, json_response, run_cpu, run_io
+from .kaggle_api import api, cached_api
 from .models import User, VerifyCode, Category, RewardType, Tag
-from .services import api_competitions_to_df, active_competitions_to_dto_list, get_active_competitions, \
-    get_filtered_active_competitions, get_competitions_categories_stats, get_competitions_organizations_stats, \
-    get_competitions_reward_type_stats, get_competitions_tags_stats
+from .model_registry import model_registry
+from .prediction_batcher import prediction_batcher
+from .prediction_cache import prediction_cache
+from .reference_cache import reference_cache
+from .snapshots import active_competitions_snapshots
+from .services import api_competitions_to_df, active_competitions_to_dto_list, get_filtered_active_competitions, \
+    get_competitions_categories_stats, get_competitions_organizations_stats, get_competitions_reward_type_stats, \
+    get_competitions_tags_stats
 from .utils import Util, generate_code
 
 
@@ -42,47 +54,60 @@ class SignUpView(generics.GenericAPIView):
         return Response(user_data, status=status.HTTP_201_CREATED)
 
 
-@api_view(["GET"])
-def competitions_categories_stat_view(request):
-    dictionary = get_competitions_categories_stats()
-    return Response(dictionary, status=status.HTTP_200_OK)
+@async_api_view(["GET"])
+async def competitions_categories_stat_view(request):
+    dictionary = await run_io(get_competitions_categories_stats)
+    return json_response(dictionary)
 
 
-@api_view(["GET"])
-def competitions_organizations_stat_view(request):
-    dictionary = get_competitions_organizations_stats()
-    return Response(dictionary, status=status.HTTP_200_OK)
+@async_api_view(["GET"])
+async def competitions_organizations_stat_view(request):
+    dictionary = await run_io(get_competitions_organizations_stats)
+    return json_response(dictionary)
 
 
-@api_view(["GET"])
-def competitions_reward_type_stat_view(request):
-    dictionary = get_competitions_reward_type_stats()
-    return Response(dictionary, status=status.HTTP_200_OK)
+@async_api_view(["GET"])
+async def competitions_reward_type_stat_view(request):
+    dictionary = await run_io(get_competitions_reward_type_stats)
+    return json_response(dictionary)
 
 
-@api_view(["GET"])
-def competitions_tags_stat_view(request):
-    dictionary = get_competitions_tags_stats()
-    return Response(dictionary, status=status.HTTP_200_OK)
+@async_api_view(["GET"])
+async def competitions_tags_stat_view(request):
+    dictionary = await run_io(get_competitions_tags_stats)
+    return json_response(dictionary)
 
 
-@api_view(["GET"])
-def competitions_view(request):
-    api_active_competitions = get_active_competitions()
-    active_competitions_df = api_competitions_to_df(api_active_competitions)
+@async_api_view(["GET"])
+async def competitions_view(request):
+    entry = await run_io(cached_api.competitions_list_entry)
+    snapshot = await run_cpu(active_competitions_snapshots.get, entry)
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    if '*' in etags or snapshot.etag in etags:
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = HttpResponse(snapshot.payload, content_type='application/json', status=status.HTTP_200_OK)
+    response['ETag'] = snapshot.etag
+    return response
+
+
+def search_active_competitions(entry, **filters):
+    api_filtered_competitions = get_filtered_active_competitions(entry=entry, **filters)
+    if len(api_filtered_competitions) == 0:
+        return None
+    active_competitions_df = api_competitions_to_df(api_filtered_competitions)
     active_competitions = active_competitions_to_dto_list(active_competitions_df)
-    serializer = CompetitionDtoSerializer(active_competitions, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return CompetitionDtoSerializer(active_competitions, many=True).data
 
 
-@api_view(["GET"])
-def competitions_search_view(request):
-    title = request.query_params.get('title')
-    category_str = request.query_params.get('categories')
-    reward_type_str = request.query_params.get('reward_types')
-    deadline_before_str = request.query_params.get('deadline_before')
-    deadline_after_str = request.query_params.get('deadline_after')
-    tags_str = request.query_params.get('tags')
+@async_api_view(["GET"])
+async def competitions_search_view(request):
+    title = request.GET.get('title')
+    category_str = request.GET.get('categories')
+    reward_type_str = request.GET.get('reward_types')
+    deadline_before_str = request.GET.get('deadline_before')
+    deadline_after_str = request.GET.get('deadline_after')
+    tags_str = request.GET.get('tags')
 
     if title.lower() == "null":
         title = None
@@ -115,40 +140,66 @@ def competitions_search_view(request):
         if categories[0].lower() == "null":
             categories = None
 
-    api_filtered_competitions = get_filtered_active_competitions(title=title, categories=categories,
-                                                                 reward_types=reward_types,
-                                                                 deadline_before=deadline_before,
-                                                                 deadline_after=deadline_after, tags=tags)
-    if len(api_filtered_competitions) > 0:
-        active_competitions_df = api_competitions_to_df(api_filtered_competitions)
-        active_competitions = active_competitions_to_dto_list(active_competitions_df)
-        serializer = CompetitionDtoSerializer(active_competitions, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    entry = await run_io(cached_api.competitions_list_entry)
+    data = await run_cpu(search_active_competitions, entry, title=title, categories=categories,
+                         reward_types=reward_types, deadline_before=deadline_before,
+                         deadline_after=deadline_after, tags=tags)
+    return json_response(data)
+
+
+@async_api_view(["POST"])
+async def competitions_predict_view(request):
+    try:
+        data = json.loads(request.body)
+    except ValueError as ex:
+        return json_response({'detail': f'JSON parse error - {ex}'}, status.HTTP_400_BAD_REQUEST)
+
+    many = isinstance(data, list)
+    if many:
+        serializer = CompetitionPredictionSerializer(data=data, many=True, allow_empty=False,
+                                                     max_length=settings.PREDICTION_MAX_ITEMS)
     else:
-        return Response(None, status=status.HTTP_200_OK)
+        serializer = CompetitionPredictionSerializer(data=data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+    competitions = serializer.validated_data if many else [serializer.validated_data]
+    predictions, version = await asyncio.wrap_future(prediction_batcher.submit(competitions))
+    return json_response({'model_version': version, 'predictions': predictions})
 
 
 @api_view(["GET"])
 def competitions_categories_view(request):
-    available_competitions_categories = Category.objects.all()
+    available_competitions_categories = reference_cache.instances(Category)
     serializer = CategorySerializer(available_competitions_categories, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 def competitions_reward_types_view(request):
-    available_competitions_reward_types = RewardType.objects.all()
+    available_competitions_reward_types = reference_cache.instances(RewardType)
     serializer = RewardTypeSerializer(available_competitions_reward_types, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 def competitions_tags_view(request):
-    available_competitions_tags = Tag.objects.all()
+    available_competitions_tags = reference_cache.instances(Tag)
     serializer = TagSerializer(available_competitions_tags, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(["GET"])
+def metrics_view(request):
+    metrics = {'model': model_registry.info(), 'kaggle_cache': cached_api.stats(),
+               'kaggle_client': api.stats(),
+               'active_competitions_snapshot': active_competitions_snapshots.info(),
+               'reference_data': reference_cache.info(),
+               'prediction_batcher': prediction_batcher.stats(),
+               'prediction_cache': prediction_cache.stats()}
+    return Response(metrics, status=status.HTTP_200_OK)
+
+
 @permission_classes([])
 class EmailVerifyView(generics.GenericAPIView):
     serializer_class = EmailVerifySerializer
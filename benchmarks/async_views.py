@@ -0,0 +1,95 @@
+import asyncio
+import sys
+import time
+
+from kaglytics.asgi import application
+from api.fake_kaggle_api import FakeKaggleApi, make_competition
+from api.kaggle_api import cached_api
+from api.kaggle_cache import LocMemBackend
+from api.models import User
+
+COMPETITIONS = 40
+CONCURRENT_REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+UPSTREAM_LATENCY = 1.0
+STALE_UPSTREAM_LATENCY = 3.0
+BENCHMARK_USER_EMAIL = 'async-views-benchmark@example.com'
+
+
+def fake_competitions():
+    categories = ['Featured', 'Research', 'Playground', 'Getting Started']
+    rewards = ['$25,000', '€1,000', 'Knowledge', 'Swag']
+    return [make_competition(id=i, ref=f'competition-{i}', title=f'Competition {i}', description='Predict things',
+                             category=categories[i % 4], organizationName='Kaggle', reward=rewards[i % 4],
+                             tags=['tabular', 'image'][:i % 3], evaluationMetric='RMSE',
+                             deadline='2030-03-01T23:59:00Z', enabledDate='2030-01-01T00:00:00Z')
+            for i in range(COMPETITIONS)]
+
+
+async def request(path, token):
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+             'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+             'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+             'client': ('127.0.0.1', 0), 'server': ('localhost', 80)}
+    response = {'body': b''}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'] += message.get('body', b'')
+
+    await application(scope, receive, send)
+    return response
+
+
+async def timed_request(path, token):
+    start = time.perf_counter()
+    response = await request(path, token)
+    return response['status'], time.perf_counter() - start
+
+
+async def run(name, paths, token):
+    upstream_calls = cached_api.api.calls
+    start = time.perf_counter()
+    results = await asyncio.gather(*[timed_request(path, token) for path in paths])
+    duration = time.perf_counter() - start
+
+    statuses = {status for status, _ in results}
+    assert statuses == {200}, f"{name}: unexpected statuses {statuses}"
+    latencies = sorted(latency for _, latency in results)
+    print(f"{name}: {len(paths)} concurrent requests in {duration:.2f} s ({len(paths) / duration:.0f} requests/s), "
+          f"latency p50 {latencies[len(latencies) // 2]:.2f} s, max {latencies[-1]:.2f} s, "
+          f"{cached_api.api.calls - upstream_calls} upstream calls")
+
+
+async def main(token):
+    # Every request of a batch is started before any finishes, on the single event loop of one ASGI worker.
+    active = ['/api/competitions/active'] * CONCURRENT_REQUESTS
+    cached_api.api = FakeKaggleApi(fake_competitions(), latency=UPSTREAM_LATENCY)
+    cached_api.backend = LocMemBackend()
+    await run(f"cold cache, {UPSTREAM_LATENCY:.0f} s upstream pages", active + ['/api/competitions/statistics/tags'],
+              token)
+    await run("fresh cache", active, token)
+
+    cached_api.api = FakeKaggleApi(fake_competitions(), latency=STALE_UPSTREAM_LATENCY)
+    cached_api.ttl = 0
+    await run(f"stale cache, {STALE_UPSTREAM_LATENCY:.0f} s upstream refresh", active, token)
+
+    await run("statistics", ['/api/competitions/statistics/categories', '/api/competitions/statistics/organizations',
+                             '/api/competitions/statistics/rewardtypes', '/api/competitions/statistics/tags']
+              * (CONCURRENT_REQUESTS // 4), token)
+
+    while cached_api._refreshing:
+        await asyncio.sleep(0.1)
+
+
+if __name__ == '__main__':
+    user, created = User.objects.get_or_create(email=BENCHMARK_USER_EMAIL, defaults={'username': 'async-benchmark'})
+    try:
+        asyncio.run(main(user.tokens()['access']))
+    finally:
+        if created:
+            user.delete()
@@ -0,0 +1,41 @@
+import random
+
+import pandas as pd
+
+from api.data_preprocessing import encode_tags
+from benchmarks import best_time
+
+COMPETITIONS = 60
+
+
+def iterrows_encode_tags(active_df, tags_names):
+    active_df = active_df.copy()
+    for tag in tags_names:
+        tag_list = []
+        for index, row in active_df.iterrows():
+            row['tags'] = map(lambda t: str(t), row['tags'])
+            tag_list.append(1 if tag in row['tags'] else 0)
+        active_df[tag] = tag_list
+    return active_df.drop(columns=['id', 'tags'])
+
+
+def main():
+    vocabulary = list(dict.fromkeys(pd.read_csv("./api/data/Tags.csv")['Name']))
+    rng = random.Random(0)
+    tags = pd.Series([rng.sample(vocabulary, rng.randint(0, 5)) + ['unknown tag'] * rng.randint(0, 1)
+                      for _ in range(COMPETITIONS)])
+    # Mixed dtypes, as in api_competitions_to_df, make iterrows yield row copies.
+    active_df = pd.DataFrame({'id': range(COMPETITIONS), 'tags': tags})
+
+    expected = iterrows_encode_tags(active_df, vocabulary)
+    actual = encode_tags(tags, vocabulary)
+    pd.testing.assert_frame_equal(actual.sparse.to_dense().astype('int64'), expected)
+
+    old = best_time(lambda: iterrows_encode_tags(active_df, vocabulary), repeat=1)
+    new = best_time(lambda: encode_tags(tags, vocabulary))
+    print(f"encode_tags, {COMPETITIONS} competitions x {len(vocabulary)} tags: frames identical")
+    print(f"iterrows: {old * 1000:.1f} ms, vectorized: {new * 1000:.1f} ms, {old / new:.0f}x faster")
+
+
+if __name__ == '__main__':
+    main()
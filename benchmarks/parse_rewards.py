@@ -0,0 +1,69 @@
+import random
+import re
+
+import pandas as pd
+
+from api.data_preprocessing import parse_rewards
+from benchmarks import best_time
+
+ACTIVE_COMPETITIONS = 200
+CURRENCY_PREFIXES = {'USD': '$', 'EUR': '€'}
+
+
+def loop_parse_rewards(active_df):
+    reward_type = []
+    reward_quantity = []
+    for index, row in active_df.iterrows():
+
+        if re.match(r'(\$)', row['reward']):
+            s = re.match(r'(?:\$)(.+)', row['reward']).group(1).replace(',', '')
+            reward_type.append('USD')
+            reward_quantity.append(int(s))
+
+        elif re.match(r'(\€)', row['reward']):
+            s = re.match(r'(?:€)(.+)', row['reward']).group(1).replace(',', '')
+            reward_type.append('EUR')
+            reward_quantity.append(int(s))
+
+        else:
+            reward_type.append(row['reward'])
+            reward_quantity.append(0)
+    return reward_type, reward_quantity
+
+
+def csv_rewards():
+    # Competitions.csv ships rewards already split, so the strings the Kaggle API returns are rebuilt from them.
+    # Rows without a reward type are treated as Knowledge competitions.
+    df = pd.read_csv("./api/data/Competitions.csv")
+    rewards = []
+    for reward_type, quantity in zip(df['RewardType'].fillna('Knowledge'), df['RewardQuantity'].fillna(0)):
+        prefix = CURRENCY_PREFIXES.get(reward_type)
+        rewards.append(f"{prefix}{int(quantity):,}" if prefix else reward_type)
+    return rewards
+
+
+def live_rewards():
+    rng = random.Random(0)
+    return [rng.choice(['$25,000', '$1,000,000', '€1,000', 'Knowledge', 'Swag', 'Kudos'])
+            for _ in range(ACTIVE_COMPETITIONS)]
+
+
+def main():
+    for name, rewards in (('Competitions.csv', csv_rewards()), ('live competitions', live_rewards())):
+        # Mixed dtypes, as in api_competitions_to_df.
+        active_df = pd.DataFrame({'id': range(len(rewards)), 'reward': rewards})
+
+        expected_type, expected_quantity = loop_parse_rewards(active_df)
+        reward_type, reward_quantity = parse_rewards(active_df['reward'])
+        assert reward_type.tolist() == expected_type, f"Reward types differ on {name}"
+        assert reward_quantity.tolist() == expected_quantity, f"Reward quantities differ on {name}"
+
+        old = best_time(lambda: loop_parse_rewards(active_df))
+        new = best_time(lambda: parse_rewards(active_df['reward']))
+        print(f"parse_rewards, {name}, {len(rewards)} rewards: results identical")
+        print(f"  loop: {old * 1000:.1f} ms ({len(rewards) / old:,.0f} rewards/s), "
+              f"vectorized: {new * 1000:.1f} ms ({len(rewards) / new:,.0f} rewards/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import random
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks import best_time
+from api.data_preprocessing import preprocess_data, preprocess_active_competitions, CAT_FEATURES, TEXT_FEATURES
+from api.fake_kaggle_api import make_competition
+from api.feature_store import read_features, tag_columns, FEATURE_STORE_PATH
+from api.model_registry import model_registry
+from api.models import Tag
+from api.prediction_model import create_pools
+from api.reference_cache import reference_cache
+from api.services import api_competitions_to_df
+
+ACTIVE_COMPETITIONS = 200
+
+
+def traced(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def megabytes(value):
+    return f"{value / 2 ** 20:.2f} MB"
+
+
+def densify(df, tag_names):
+    df = df.copy()
+    df[tag_names] = df[tag_names].sparse.to_dense().astype(np.int64)
+    return df
+
+
+def read_dense_features():
+    # The layout of the former out.csv frame: every tag is a dense int64 column.
+    with pa.memory_map(FEATURE_STORE_PATH) as source:
+        df = pa.ipc.open_file(source).read_all().to_pandas()
+    tag_names = tag_columns()
+    df[tag_names] = df[tag_names].astype(np.int64)
+    return df
+
+
+def training_frame(read):
+    x, y = preprocess_data(read())
+    create_pools(x, y, 0.25, CAT_FEATURES, TEXT_FEATURES)
+    return x
+
+
+def active_competitions():
+    tags = reference_cache.names(Tag)
+    rng = random.Random(0)
+    return [make_competition(id=i, title=f'Competition {i}', description='Predict things',
+                             category=rng.choice(['Featured', 'Research', 'Playground']), organizationName='Kaggle',
+                             reward=rng.choice(['$25,000', 'Knowledge']), tags=rng.sample(tags, rng.randint(0, 5)),
+                             evaluationMetric='RMSE', deadline='2030-03-01T23:59:00Z',
+                             enabledDate='2030-01-01T00:00:00Z')
+            for i in range(ACTIVE_COMPETITIONS)]
+
+
+def predict(loaded_model, competitions, dense):
+    df = api_competitions_to_df(competitions)
+    if dense:
+        df = densify(df, reference_cache.names(Tag))
+    preprocess_active_competitions(df, loaded_model.vocabularies)
+    return df, loaded_model.model.predict(df[loaded_model.model.feature_names])
+
+
+def main():
+    # Hundreds of dense tag columns fragment the request frame, which is what this compares against.
+    warnings.simplefilter('ignore', pd.errors.PerformanceWarning)
+    print(f"Training frame, {len(tag_columns())} tags:")
+    for name, read in (('dense int64', read_dense_features), ('sparse uint8', read_features)):
+        x, peak = traced(lambda: training_frame(read))
+        print(f"  {name}: frame {megabytes(x.memory_usage(deep=True).sum())}, peak {megabytes(peak)}")
+
+    loaded_model = model_registry.get()
+    competitions = active_competitions()
+    print(f"Request, {ACTIVE_COMPETITIONS} active competitions:")
+    results = {}
+    for name, dense in (('dense int64', True), ('sparse uint8', False)):
+        (df, predictions), peak = traced(lambda: predict(loaded_model, competitions, dense))
+        latency = best_time(lambda: predict(loaded_model, competitions, dense))
+        results[name] = predictions
+        print(f"  {name}: frame {megabytes(df.memory_usage(deep=True).sum())}, peak {megabytes(peak)}, "
+              f"{latency * 1000:.0f} ms")
+    assert np.array_equal(*results.values()), "Predictions differ between dense and sparse tag columns"
+    print("Predictions identical.")
+
+
+if __name__ == '__main__':
+    main()
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'corsheaders',
     'api',
+    'scheduler',
 ]
 
 MIDDLEWARE = [
@@ -137,3 +138,45 @@ EMAIL_HOST = 'smtp.mail.ru'
 EMAIL_PORT = 2525
 EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
+
+REFERENCE_DATA_CHECK_INTERVAL = env.float('REFERENCE_DATA_CHECK_INTERVAL', default=5.0)
+
+ASYNC_IO_WORKERS = env.int('ASYNC_IO_WORKERS', default=16)
+ASYNC_CPU_WORKERS = env.int('ASYNC_CPU_WORKERS', default=2)
+
+PREDICTION_MAX_BATCH_SIZE = env.int('PREDICTION_MAX_BATCH_SIZE', default=64)
+PREDICTION_MAX_WAIT = env.float('PREDICTION_MAX_WAIT', default=0.01)
+PREDICTION_MAX_ITEMS = env.int('PREDICTION_MAX_ITEMS', default=100)
+PREDICTION_CACHE_BACKEND = env('PREDICTION_CACHE_BACKEND', default='locmem')
+PREDICTION_CACHE_MAX_ENTRIES = env.int('PREDICTION_CACHE_MAX_ENTRIES', default=10000)
+
+KAGGLE_CACHE_BACKEND = env('KAGGLE_CACHE_BACKEND', default='locmem')
+KAGGLE_CACHE_TTL = env.int('KAGGLE_CACHE_TTL', default=300)
+KAGGLE_PAGE_WORKERS = env.int('KAGGLE_PAGE_WORKERS', default=4)
+KAGGLE_PAGE_TIMEOUT = env.float('KAGGLE_PAGE_TIMEOUT', default=10.0)
+KAGGLE_MAX_PAGES = env.int('KAGGLE_MAX_PAGES', default=50)
+
+KAGGLE_CLIENT = {
+    'CONNECT_TIMEOUT': env.float('KAGGLE_CLIENT_CONNECT_TIMEOUT', default=5.0),
+    'READ_TIMEOUT': env.float('KAGGLE_CLIENT_READ_TIMEOUT', default=30.0),
+    'POOL_SIZE': env.int('KAGGLE_CLIENT_POOL_SIZE', default=10),
+    'MAX_RETRIES': env.int('KAGGLE_CLIENT_MAX_RETRIES', default=3),
+    'BACKOFF_BASE': env.float('KAGGLE_CLIENT_BACKOFF_BASE', default=0.5),
+    'BACKOFF_MAX': env.float('KAGGLE_CLIENT_BACKOFF_MAX', default=8.0),
+    'FAILURE_THRESHOLD': env.int('KAGGLE_CLIENT_FAILURE_THRESHOLD', default=5),
+    'RESET_TIMEOUT': env.float('KAGGLE_CLIENT_RESET_TIMEOUT', default=60.0),
+}
+
+MODEL_TRAINING = {
+    'ITERATIONS': env.int('MODEL_TRAINING_ITERATIONS', default=1000),
+    'LEARNING_RATE': env.float('MODEL_TRAINING_LEARNING_RATE', default=0.05),
+    'THREAD_COUNT': env.int('MODEL_TRAINING_THREAD_COUNT', default=-1),
+    'EARLY_STOPPING_ROUNDS': env.int('MODEL_TRAINING_EARLY_STOPPING_ROUNDS', default=100),
+    'USE_BEST_MODEL': env.bool('MODEL_TRAINING_USE_BEST_MODEL', default=True),
+    'TIME_BUDGET': env.int('MODEL_TRAINING_TIME_BUDGET', default=1800),
+    'VERBOSE': env.int('MODEL_TRAINING_VERBOSE', default=100),
+    'INCREMENTAL_ITERATIONS': env.int('MODEL_TRAINING_INCREMENTAL_ITERATIONS', default=100),
+    'MAX_INCREMENTAL_UPDATES': env.int('MODEL_TRAINING_MAX_INCREMENTAL_UPDATES', default=6),
+    'FULL_RETRAIN_DAYS': env.int('MODEL_TRAINING_FULL_RETRAIN_DAYS', default=7),
+    'VALIDATION_TOLERANCE': env.float('MODEL_TRAINING_VALIDATION_TOLERANCE', default=0.0),
+}
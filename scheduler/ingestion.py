@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+
+import pandas as pd
+
+from api.files import atomic_open
+
+DATA_DIR = "./api/data"
+STATE_FILE_PATH = "./api/data/ingestion_state.json"
+META_KAGGLE_DATASET = 'Kaggle/meta-kaggle'
+DOWNLOADED_FILES = ['Competitions.csv', 'CompetitionTags.csv']
+LOCAL_FILES = ['Tags.csv', 'Organizations.csv']
+
+consumers_lock = threading.Lock()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def row_checksums(df_competitions):
+    hashes = pd.util.hash_pandas_object(df_competitions, index=False)
+    return {str(competition_id): str(row_hash) for competition_id, row_hash in zip(df_competitions['Id'], hashes)}
+
+
+class IngestionState:
+    def __init__(self, path=STATE_FILE_PATH):
+        self.path = path
+        self.data = {'version': None, 'previous_version': None, 'files': {}, 'rows': {}, 'changed_ids': [],
+                     'consumers': {}}
+        if os.path.exists(path):
+            self.data.update(self._read())
+
+    def _read(self):
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def version(self):
+        return self.data['version']
+
+    def save(self):
+        with atomic_open(self.path, encoding='utf-8') as f:
+            json.dump(self.data, f)
+
+    def files_changed(self, files):
+        return files != self.data['files']
+
+    def record_snapshot(self, files, rows):
+        previous_rows = self.data['rows']
+        changed_ids = [int(competition_id) for competition_id, checksum in rows.items()
+                       if previous_rows.get(competition_id) != checksum]
+
+        self.data['previous_version'] = self.data['version']
+        self.data['version'] = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+        self.data['files'] = files
+        self.data['rows'] = rows
+        self.data['changed_ids'] = changed_ids
+        return changed_ids
+
+    def pending_changes(self, consumer):
+        consumed = self.data['consumers'].get(consumer)
+        if self.version is None:
+            return None
+        if consumed == self.version:
+            return []
+        if consumed is not None and consumed == self.data['previous_version']:
+            return self.data['changed_ids']
+        return None
+
+    def mark_consumed(self, consumer):
+        with consumers_lock:
+            if os.path.exists(self.path):
+                self.data['consumers'] = self._read()['consumers']
+            self.data['consumers'][consumer] = self.version
+            self.save()
+
+
+def download_meta_kaggle_files(api, directory):
+    for file_name in DOWNLOADED_FILES:
+        api.dataset_download_file(META_KAGGLE_DATASET, file_name, path=directory)
+        zip_file_path = os.path.join(directory, f"{file_name}.zip")
+        if os.path.exists(zip_file_path):
+            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+                zip_ref.extractall(directory)
+
+
+def fetch_meta_kaggle(api, state, data_dir=DATA_DIR):
+    download_dir = tempfile.mkdtemp(dir=data_dir, prefix='.download-')
+    try:
+        download_meta_kaggle_files(api, download_dir)
+        files = {file_name: file_hash(os.path.join(download_dir, file_name)) for file_name in DOWNLOADED_FILES}
+        files.update({file_name: file_hash(os.path.join(data_dir, file_name)) for file_name in LOCAL_FILES})
+        if not state.files_changed(files):
+            return None
+
+        for file_name in os.listdir(download_dir):
+            os.replace(os.path.join(download_dir, file_name), os.path.join(data_dir, file_name))
+        return files
+    finally:
+        shutil.rmtree(download_dir, ignore_errors=True)
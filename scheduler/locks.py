@@ -0,0 +1,59 @@
+import contextlib
+import fcntl
+import functools
+import os
+import zlib
+
+from django.db import connection
+
+LOCKS_DIR = "./api/data"
+
+
+def advisory_lock_key(name):
+    return zlib.crc32(f"kaglytics:{name}".encode('utf-8'))
+
+
+@contextlib.contextmanager
+def postgres_lock(name):
+    key = advisory_lock_key(name)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+        acquired = cursor.fetchone()[0]
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+
+
+@contextlib.contextmanager
+def file_lock(name, locks_dir=LOCKS_DIR):
+    with open(os.path.join(locks_dir, f".{name}.lock"), 'a') as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def job_lock(name):
+    if connection.vendor == 'postgresql':
+        return postgres_lock(name)
+    return file_lock(name)
+
+
+def exclusive_job(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with job_lock(func.__name__) as acquired:
+            if not acquired:
+                print(f"Job {func.__name__} is already running in another worker, skipping.")
+                return False
+            return func(*args, **kwargs)
+
+    return wrapper
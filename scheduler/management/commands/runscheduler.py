@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Runs the scheduler of Meta Kaggle ingestion and model retraining jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run the competitions pipeline once and exit')
+
+    def handle(self, *args, **options):
+        from scheduler import scheduler
+        if options['once']:
+            scheduler.run_pipeline()
+        else:
+            scheduler.start()
@@ -0,0 +1,121 @@
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+from django.db import connections
+
+from api.files import atomic_open
+
+PIPELINE_STATE_PATH = "./api/data/pipeline_state.json"
+
+COMPLETED = 'completed'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+BLOCKED = 'blocked'
+
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=()):
+        self.name = name
+        self.func = func
+        self.inputs = set(inputs)
+        self.outputs = set(outputs)
+
+
+class StageRun:
+    def __init__(self, name, status, started_at=None, duration=None, error=None, details=None):
+        self.name = name
+        self.status = status
+        self.started_at = started_at
+        self.duration = duration
+        self.error = error
+        self.details = details
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class Pipeline:
+    def __init__(self, stages, max_workers=2, state_path=PIPELINE_STATE_PATH):
+        self.stages = {stage.name: stage for stage in stages}
+        self.upstream = {stage.name: {other.name for other in stages if other is not stage and
+                                      other.outputs & stage.inputs} for stage in stages}
+        self.max_workers = max_workers
+        self.state_path = state_path
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order = []
+        remaining = dict(self.upstream)
+        while remaining:
+            ready = [name for name, upstream in remaining.items() if upstream <= set(order)]
+            if not ready:
+                raise ValueError(f"Pipeline stages have cyclic dependencies: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+
+    def run(self):
+        started_at = datetime.now()
+        start = time.perf_counter()
+        runs = {}
+        running = {}
+        pending = list(self.order)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    if not self.upstream[name] <= runs.keys():
+                        continue
+                    pending.remove(name)
+                    if any(runs[upstream].status in (FAILED, BLOCKED) for upstream in self.upstream[name]):
+                        runs[name] = StageRun(name, BLOCKED)
+                        print(f"Stage {name} is blocked by a failed upstream stage.")
+                    else:
+                        running[executor.submit(self._run_stage, self.stages[name])] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    runs[running.pop(future)] = future.result()
+
+        stage_runs = [runs[name] for name in self.order]
+        self._save(started_at, time.perf_counter() - start, stage_runs)
+        return stage_runs
+
+    @staticmethod
+    def _run_stage(stage):
+        started_at = datetime.now()
+        start = time.perf_counter()
+        status = COMPLETED
+        error = None
+        details = None
+        try:
+            result = stage.func()
+            if result is False:
+                status = SKIPPED
+            elif isinstance(result, dict):
+                details = result
+        except Exception as ex:
+            traceback.print_exc()
+            status = FAILED
+            error = repr(ex)
+        finally:
+            connections.close_all()
+
+        duration = time.perf_counter() - start
+        print(f"Stage {stage.name} {status} in {duration:.2f}s.")
+        return StageRun(stage.name, status, started_at.isoformat(), duration, error, details)
+
+    def _save(self, started_at, duration, stage_runs):
+        data = {
+            'started_at': started_at.isoformat(),
+            'duration': duration,
+            'stages': [stage_run.to_dict() for stage_run in stage_runs],
+        }
+        with atomic_open(self.state_path, encoding='utf-8') as f:
+            json.dump(data, f)
@@ -1,119 +1,213 @@
-import os
 import sys
-import zipfile
-from datetime import datetime
-import joblib
+from datetime import datetime, timedelta
 
-import numpy as np
 import pandas as pd
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+from catboost import CatBoostError
+from django.conf import settings
 from django_apscheduler.jobstores import DjangoJobStore, register_events
+from django_apscheduler.models import DjangoJob
+from django_apscheduler.util import close_old_connections
 
 from api.kaggle_api import api
-from api.models import Competition, Tag
-from api.utils import extract_competition_from_row
-from api.data_preprocessing import preprocess_data, CAT_FEATURES, TEXT_FEATURES
-from api.prediction_model import create_pools, fit_model, FITTED_MODEL_FILENAME, get_model
+from api.services import refresh_competitions_statistics
+from api.data_preprocessing import preprocess_data, build_category_vocabularies, CAT_FEATURES, TEXT_FEATURES, \
+    DATETIME_FORMAT
+from api.prediction_model import create_pool, create_pools, fit_model, get_model, split_data, validation_rmse, \
+    ModelChain, TrainingConfig
+from api.model_registry import model_registry
+from api.feature_store import read_features, tag_columns, write_features, FEATURE_STORE_PATH
+from .locks import exclusive_job
+from .pipeline import Pipeline, Stage
+from .ingestion import IngestionState, fetch_meta_kaggle, file_hash, row_checksums
+from .sync import sync_competitions, SYNCED_COLUMNS
+
+
+def build_competitions_info(df_competitions, df_competitions_tags, df_tags, df_organizations):
+    tag_ids = df_competitions_tags['TagId'].astype(str)
+    tags_columns = list(dict.fromkeys(tag_ids))
+    competitions_tags = pd.crosstab(df_competitions_tags['CompetitionId'], tag_ids).clip(upper=1)
+    competitions_tags = competitions_tags.reindex(index=df_competitions['Id'], columns=tags_columns, fill_value=0)
+    competitions_tags.index = df_competitions.index
+    df_competitions = pd.concat([df_competitions, competitions_tags], axis=1)
+
+    df_tags = df_tags.drop_duplicates(subset='Id')
+    tag_names = dict(zip(df_tags['Id'].astype(str), df_tags['Name']))
+    df_competitions = df_competitions.rename(columns=tag_names)
+
+    df_organizations = df_organizations.drop_duplicates(subset='Id')
+    organization_names = dict(zip(df_organizations['Id'].map(lambda i: str(float(i))), df_organizations['Name']))
+    organization_ids = df_competitions['OrganizationId'].astype(str)
+    df_competitions['OrganizationId'] = organization_ids.map(organization_names).where(
+        organization_ids.isin(organization_names.keys()), organization_ids)
+
+    df_competitions = df_competitions.rename(columns={'OrganizationId': 'OrganizationName'})
+    return df_competitions, [tag_names.get(column, column) for column in tags_columns]
 
 
 def update_competitions_info_file():
     print("Start updating competitions info file...")
 
-    zip_file_path = "./api/data/Competitions.csv.zip"
-    competition_file_path = "./api/data/Competitions.csv"
-    competition_tags_file_path = "./api/data/CompetitionTags.csv"
-
-    if os.path.exists(zip_file_path):
-        os.remove(zip_file_path)
-    if os.path.exists(competition_file_path):
-        os.remove(competition_file_path)
-    if os.path.exists(competition_tags_file_path):
-        os.remove(competition_tags_file_path)
-
-    api.dataset_download_file('Kaggle/meta-kaggle', 'Competitions.csv', path="./api/data")
-    with zipfile.ZipFile("./api/data/Competitions.csv.zip", 'r') as zip_ref:
-        zip_ref.extractall("./api/data")
-    api.dataset_download_file('Kaggle/meta-kaggle', 'CompetitionTags.csv', path="./api/data")
+    state = IngestionState()
+    files = fetch_meta_kaggle(api, state)
+    if files is None:
+        print("Meta Kaggle data is unchanged, skipping competitions info file update.")
+        return False
 
     df_competitions = pd.read_csv("./api/data/Competitions.csv")
     df_competitions_tags = pd.read_csv("./api/data/CompetitionTags.csv")
     df_tags = pd.read_csv("./api/data/Tags.csv")
     df_organizations = pd.read_csv("./api/data/Organizations.csv")
 
-    tags_columns = set(df_competitions_tags['TagId'])
-    for index, row in df_competitions_tags.iterrows():
-        df_competitions.loc[df_competitions['Id'] == row['CompetitionId'], str(row['TagId'])] = 1
+    df_competitions, tag_names = build_competitions_info(df_competitions, df_competitions_tags, df_tags,
+                                                         df_organizations)
+    write_features(df_competitions, tag_names)
 
-    for tag in tags_columns:
-        df_competitions[str(tag)] = np.where(df_competitions[str(tag)] != 1, 0, 1)
+    changed_ids = state.record_snapshot(files, row_checksums(df_competitions))
+    state.save()
+    print(f"Competitions info file updated successfully, {len(changed_ids)} competitions changed.")
 
-    for index, row in df_tags.iterrows():
-        df_competitions = df_competitions.rename(columns={str(row['Id']): row['Name']})
 
-    df_competitions['OrganizationId'] = df_competitions['OrganizationId'].astype(str)
-    for index, row in df_organizations.iterrows():
-        df_competitions.loc[df_competitions['OrganizationId'] == str(float(row['Id'])), 'OrganizationId'] = row['Name']
+def update_competitions_info_table():
+    print("Start updating competitions info table...")
 
-    df_competitions = df_competitions.rename(columns={'OrganizationId': 'OrganizationName'})
-    df_competitions.to_csv("./api/data/out.csv", sep=',', encoding='utf-8', index=False)
-    print("Competitions info file updated successfully.")
+    state = IngestionState()
+    changed_ids = state.pending_changes('update_competitions_info_table')
+    if changed_ids == []:
+        print("No competitions changed since the last update, skipping competitions info table update.")
+        return False
 
+    tag_names = tag_columns()
+    df_competitions = read_features(SYNCED_COLUMNS + tag_names)
 
-def update_competitions_info_table():
-    print("Start updating competitions info table...")
+    deadlines = pd.to_datetime(df_competitions['DeadlineDate'], format=DATETIME_FORMAT)
+    selected = deadlines.dt.year == datetime.now().year
+    if changed_ids is not None:
+        selected &= df_competitions['Id'].isin(changed_ids)
+    sync_competitions(df_competitions[selected], tag_names)
 
-    df_competitions = pd.read_csv("api/data/out.csv", low_memory=False)
-    tag_names = list(df_competitions.columns.values)
-    tag_names = tag_names[42:]
-
-    for index, row in df_competitions.iterrows():
-        deadline_date_object = datetime.strptime(row['DeadlineDate'], '%m/%d/%Y %H:%M:%S')
-        if deadline_date_object.year == datetime.now().year:
-            new_competition = extract_competition_from_row(row)
-            competitions = Competition.objects.filter(kaggle_id=new_competition.kaggle_id)
-            if competitions.count() > 1:
-                for i in range(1, competitions.count()):
-                    competitions[i].delete()
-                new_competition.id = competitions[0].id
-                new_competition.save()
-            elif competitions.count() == 0:
-                new_competition.save()
-
-                competition_tags = list()
-                for tag in tag_names:
-                    if row[tag] == 1:
-                        competition_tags.append(Tag.objects.get(name=tag))
-                new_competition.tags.set(competition_tags)
-
-                print(f"Updated table. Add competition with id {new_competition.id}")
-        else:
-            continue
+    refresh_competitions_statistics()
+    state.mark_consumed('update_competitions_info_table')
     print("Competitions info table updated successfully.")
 
 
+def training_config():
+    return TrainingConfig(**{key.lower(): value for key, value in settings.MODEL_TRAINING.items()})
+
+
+def full_retrain_due(model, changed_ids, feature_names, config):
+    if changed_ids is None or model.full_trained_at is None or model.feature_names != feature_names:
+        return True
+    if model.incremental_updates >= config.max_incremental_updates:
+        return True
+    return datetime.now() - model.full_trained_at >= timedelta(days=config.full_retrain_days)
+
+
+def fit_full_model(x, y, config):
+    model = get_model(config, cat_features=CAT_FEATURES, text_features=TEXT_FEATURES)
+    train_pool, validation_pool = create_pools(x, y, 0.25, CAT_FEATURES, TEXT_FEATURES)
+    result = fit_model(model, train_pool, validation_pool, config)
+    return ModelChain([model], datetime.now()), result.to_dict()
+
+
+def fit_incremental_model(chain, x, y, changed, config):
+    x_train, x_test, y_train, y_test = split_data(x, y, 0.25)
+    changed_train = changed[x_train.index].to_numpy()
+    if not changed_train.any():
+        return chain, {'changed_rows': 0}
+
+    # Early stopping picks the best iteration on x_eval, so the gate has to judge on rows it never saw.
+    x_eval, x_holdout, y_eval, y_holdout = split_data(x_test, y_test, 0.5)
+
+    model = get_model(config, incremental=True, cat_features=CAT_FEATURES, text_features=TEXT_FEATURES)
+    train_pool = create_pool(x_train[changed_train], y_train[changed_train], CAT_FEATURES, TEXT_FEATURES,
+                             baseline_model=chain)
+    validation_pool = create_pool(x_eval, y_eval, CAT_FEATURES, TEXT_FEATURES, baseline_model=chain)
+    result = fit_model(model, train_pool, validation_pool, config, incremental=True)
+
+    candidate = chain.extend(model)
+    previous_rmse = validation_rmse(chain, x_holdout, y_holdout)
+    candidate_rmse = validation_rmse(candidate, x_holdout, y_holdout)
+    # Judging only against the previous chain would let small accepted regressions compound across updates, so the
+    # candidate must also hold up against the last fully trained model.
+    full_rmse = validation_rmse(chain.models[0], x_holdout, y_holdout) if chain.incremental_updates else previous_rmse
+    details = dict(result.to_dict(), changed_rows=int(changed_train.sum()), previous_rmse=previous_rmse,
+                   full_model_rmse=full_rmse, candidate_rmse=candidate_rmse)
+    print(f"Incremental update on {details['changed_rows']} competitions: validation RMSE "
+          f"{previous_rmse:.2f} -> {candidate_rmse:.2f} (full model {full_rmse:.2f}).")
+    if candidate_rmse > min(previous_rmse, full_rmse) * (1 + config.validation_tolerance):
+        return None, details
+    return candidate, details
+
+
 def fit_model_with_new_data():
     print("Start fitting model with new data...")
 
-    model = get_model(cat_features=CAT_FEATURES, text_features=TEXT_FEATURES)
-    data = pd.read_csv("api/data/out.csv", low_memory=False)
+    state = IngestionState()
+    changed_ids = state.pending_changes('fit_model_with_new_data')
+    if changed_ids == []:
+        print("Training data is unchanged, skipping model fitting.")
+        return False
+
+    config = training_config()
+    training_data_hash = file_hash(FEATURE_STORE_PATH)
+    data = read_features()
+    changed = data['Id'].isin(changed_ids or [])
     x, y = preprocess_data(data)
-    train_pool, validation_pool = create_pools(x, y, 0.25, CAT_FEATURES, TEXT_FEATURES)
-    fit_model(model, train_pool, validation_pool)
 
-    joblib.dump(model, f"./api/models/{FITTED_MODEL_FILENAME}")
-    print("Model was fitted successfully.")
+    current_model = model_registry.get_model()
+    if full_retrain_due(current_model, changed_ids, list(x.columns), config):
+        mode = 'full'
+        model, details = fit_full_model(x, y, config)
+    else:
+        mode = 'incremental'
+        try:
+            model, details = fit_incremental_model(current_model, x, y, changed, config)
+        except CatBoostError as ex:
+            print(f"Incremental update failed: {ex}")
+            model = None
+        if model is None:
+            print("Incremental update was rejected, falling back to full retrain.")
+            mode = 'full_after_rejected_incremental'
+            model, details = fit_full_model(x, y, config)
+
+    if model is not current_model:
+        model_registry.publish(model, build_category_vocabularies(x), training_data_hash)
+    state.mark_consumed('fit_model_with_new_data')
+    print(f"Model was fitted successfully ({mode}): {details}.")
+    return dict(details, mode=mode)
+
+
+pipeline = Pipeline([
+    Stage('update_competitions_info_file', update_competitions_info_file,
+          inputs=['meta_kaggle'], outputs=['competitions_features']),
+    Stage('update_competitions_info_table', update_competitions_info_table,
+          inputs=['competitions_features'], outputs=['competitions_table', 'competitions_statistics']),
+    Stage('fit_model_with_new_data', fit_model_with_new_data,
+          inputs=['competitions_features'], outputs=['fitted_model']),
+])
+
+
+@close_old_connections
+@exclusive_job
+def run_pipeline():
+    print("Start running competitions pipeline...")
+    stage_runs = pipeline.run()
+    print("Competitions pipeline finished: " +
+          ", ".join(f"{stage_run.name} {stage_run.status}" for stage_run in stage_runs))
 
 
 def start():
-
-    scheduler = BackgroundScheduler()
+    scheduler = BlockingScheduler()
     scheduler.add_jobstore(DjangoJobStore(), "default")
-    scheduler.add_job(update_competitions_info_file, 'interval', hours=24, name='update_competitions_info_file',
-                      jobstore='default')
-    scheduler.add_job(update_competitions_info_table, 'interval', hours=24, name='update_competitions_info_table',
-                      jobstore='default')
-    scheduler.add_job(fit_model_with_new_data, 'interval', hours=24, name='fit_model_with_new_data',
-                      jobstore='default')
+    DjangoJob.objects.exclude(id=run_pipeline.__name__).delete()
+    scheduler.add_job(run_pipeline, 'interval', hours=24, id=run_pipeline.__name__, name=run_pipeline.__name__,
+                      jobstore='default', max_instances=1, replace_existing=True)
     register_events(scheduler)
-    scheduler.start()
+
     print("Scheduler started...", file=sys.stdout)
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
+        print("Scheduler stopped.", file=sys.stdout)
@@ -0,0 +1,75 @@
+from django.db import transaction
+
+from api.data_preprocessing import tag_positions
+from api.models import Competition, Category, EvaluationMetric, Organization, RewardType, Tag
+from api.reference_cache import reference_cache
+from api.utils import extract_competition_from_row
+
+SYNCED_COLUMNS = ['Id', 'Title', 'Subtitle', 'HostSegmentTitle', 'OrganizationName', 'EvaluationAlgorithmName',
+                  'MaxDailySubmissions', 'MaxTeamSize', 'RewardType', 'RewardQuantity', 'TotalTeams',
+                  'TotalCompetitors', 'TotalSubmissions', 'EnabledDate', 'DeadlineDate']
+COMPETITION_UPDATE_FIELDS = ['title', 'description', 'category', 'organization', 'evaluationMetric',
+                             'maxDailySubmissions', 'maxTeamSize', 'rewardType', 'rewardQuantity', 'totalTeams',
+                             'totalCompetitors', 'totalSubmissions', 'enabledDate', 'deadline']
+
+
+def resolve_dimensions(df_competitions):
+    organizations = df_competitions['OrganizationName'].dropna()
+    reference_cache.get_or_create_many(Organization, organizations[organizations.astype(str) != 'nan'])
+    reference_cache.get_or_create_many(Category, df_competitions['HostSegmentTitle'])
+    reference_cache.get_or_create_many(EvaluationMetric, df_competitions['EvaluationAlgorithmName'])
+    reference_cache.get_or_create_many(RewardType, df_competitions['RewardType'])
+
+
+def split_existing_competitions(kaggle_ids):
+    existing = {}
+    duplicates = []
+    rows = Competition.objects.filter(kaggle_id__in=kaggle_ids).order_by('id').values_list('id', 'kaggle_id')
+    for competition_id, kaggle_id in rows:
+        if kaggle_id in existing:
+            duplicates.append(competition_id)
+        else:
+            existing[kaggle_id] = competition_id
+    return existing, duplicates
+
+
+def build_competition_tags(df_competitions, competitions, tag_names):
+    tags = reference_cache.by_name(Tag)
+    through = Competition.tags.through
+
+    competition_tags = []
+    rows, columns = tag_positions(df_competitions, tag_names)
+    for row, column in zip(rows, columns):
+        tag = tags.get(tag_names[column])
+        if tag is not None:
+            competition_tags.append(through(competition_id=competitions[row].id, tag_id=tag.id))
+    return competition_tags
+
+
+@transaction.atomic
+def sync_competitions(df_competitions, tag_names):
+    df_competitions = df_competitions.drop_duplicates(subset='Id').reset_index(drop=True)
+    resolve_dimensions(df_competitions)
+
+    competitions = [extract_competition_from_row(row) for row in df_competitions.to_dict('records')]
+    existing, duplicates = split_existing_competitions([c.kaggle_id for c in competitions])
+    Competition.objects.filter(id__in=duplicates).delete()
+
+    new_competitions = []
+    updated_competitions = []
+    for competition in competitions:
+        competition.id = existing.get(competition.kaggle_id)
+        if competition.id is None:
+            new_competitions.append(competition)
+        else:
+            updated_competitions.append(competition)
+
+    Competition.objects.bulk_create(new_competitions)
+    Competition.objects.bulk_update(updated_competitions, COMPETITION_UPDATE_FIELDS, batch_size=500)
+
+    through = Competition.tags.through
+    through.objects.filter(competition_id__in=[c.id for c in competitions]).delete()
+    through.objects.bulk_create(build_competition_tags(df_competitions, competitions, tag_names))
+
+    print(f"Updated table. Added {len(new_competitions)}, updated {len(updated_competitions)}, "
+          f"removed {len(duplicates)} duplicate competitions.")
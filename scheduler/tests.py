@@ -0,0 +1,107 @@
+import os
+import tempfile
+import zipfile
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api.fake_kaggle_api import FakeKaggleApi
+from .ingestion import IngestionState, fetch_meta_kaggle, row_checksums
+
+CONSUMER = 'update_competitions_info_table'
+
+
+class MetaKaggleIngestionTest(SimpleTestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.data_dir = os.path.join(temp_dir.name, 'data')
+        self.datasets_dir = os.path.join(temp_dir.name, 'datasets')
+        os.mkdir(self.data_dir)
+        os.mkdir(self.datasets_dir)
+
+        pd.DataFrame({'Id': [1], 'Name': ['tabular']}).to_csv(os.path.join(self.data_dir, 'Tags.csv'), index=False)
+        pd.DataFrame({'Id': [1], 'Name': ['Kaggle']}).to_csv(os.path.join(self.data_dir, 'Organizations.csv'),
+                                                             index=False)
+        self.competitions = pd.DataFrame({'Id': [10, 11, 12], 'Title': ['A', 'B', 'C'], 'TotalTeams': [5, 6, 7]})
+        self.publish()
+
+        self.api = FakeKaggleApi(datasets_dir=self.datasets_dir)
+        self.state_path = os.path.join(self.data_dir, 'ingestion_state.json')
+
+    def publish(self):
+        with zipfile.ZipFile(os.path.join(self.datasets_dir, 'Competitions.csv.zip'), 'w') as zip_file:
+            zip_file.writestr('Competitions.csv', self.competitions.to_csv(index=False))
+        pd.DataFrame({'Id': [1, 2], 'CompetitionId': [10, 11], 'TagId': [1, 1]}).to_csv(
+            os.path.join(self.datasets_dir, 'CompetitionTags.csv'), index=False)
+
+    def ingest(self):
+        state = IngestionState(self.state_path)
+        files = fetch_meta_kaggle(self.api, state, self.data_dir)
+        if files is None:
+            return None
+        df_competitions = pd.read_csv(os.path.join(self.data_dir, 'Competitions.csv'))
+        changed_ids = state.record_snapshot(files, row_checksums(df_competitions))
+        state.save()
+        return changed_ids
+
+    def test_first_download_is_a_full_update(self):
+        self.assertEqual(self.ingest(), [10, 11, 12])
+
+        state = IngestionState(self.state_path)
+        self.assertIsNotNone(state.version)
+        self.assertIsNone(state.pending_changes(CONSUMER))
+        self.assertEqual(sorted(os.listdir(self.data_dir)),
+                         ['CompetitionTags.csv', 'Competitions.csv', 'Competitions.csv.zip', 'Organizations.csv',
+                          'Tags.csv', 'ingestion_state.json'])
+
+    def test_unchanged_download_is_skipped(self):
+        self.ingest()
+        version = IngestionState(self.state_path).version
+        modified_at = os.path.getmtime(os.path.join(self.data_dir, 'Competitions.csv'))
+
+        self.assertIsNone(self.ingest())
+        self.assertEqual(IngestionState(self.state_path).version, version)
+        self.assertEqual(os.path.getmtime(os.path.join(self.data_dir, 'Competitions.csv')), modified_at)
+        self.assertFalse([name for name in os.listdir(self.data_dir) if name.startswith('.download-')])
+
+    def test_changed_rows_are_pending_for_consumers(self):
+        self.ingest()
+        state = IngestionState(self.state_path)
+        state.mark_consumed(CONSUMER)
+        self.assertEqual(IngestionState(self.state_path).pending_changes(CONSUMER), [])
+
+        self.competitions.loc[self.competitions['Id'] == 11, 'TotalTeams'] = 60
+        self.competitions.loc[len(self.competitions)] = [13, 'D', 8]
+        self.publish()
+        self.assertEqual(self.ingest(), [11, 13])
+
+        state = IngestionState(self.state_path)
+        self.assertEqual(state.pending_changes(CONSUMER), [11, 13])
+        self.assertIsNone(state.pending_changes('fit_model_with_new_data'))
+
+    def test_consumer_that_missed_a_version_gets_a_full_update(self):
+        self.ingest()
+        IngestionState(self.state_path).mark_consumed(CONSUMER)
+
+        for teams in (60, 70):
+            self.competitions.loc[self.competitions['Id'] == 11, 'TotalTeams'] = teams
+            self.publish()
+            self.ingest()
+
+        self.assertIsNone(IngestionState(self.state_path).pending_changes(CONSUMER))
+
+    def test_consumers_are_tracked_independently(self):
+        self.ingest()
+        IngestionState(self.state_path).mark_consumed(CONSUMER)
+        IngestionState(self.state_path).mark_consumed('fit_model_with_new_data')
+
+        self.competitions.loc[self.competitions['Id'] == 10, 'Title'] = 'A2'
+        self.publish()
+        self.ingest()
+        state = IngestionState(self.state_path)
+        state.mark_consumed(CONSUMER)
+
+        state = IngestionState(self.state_path)
+        self.assertEqual(state.pending_changes(CONSUMER), [])
+        self.assertEqual(state.pending_changes('fit_model_with_new_data'), [10])